@@ -0,0 +1,403 @@
+"""Benchmark suite for the conversions package.
+
+Every case runs in a fresh process on a generated synthetic scene and reports
+the best wall time over a number of repeats, the peak resident memory added by
+the case, and the size of the written file(s). Mesh cases also report their
+throughput in faces per second.
+
+Usage:
+    python scripts/benchmark.py [--size small|medium|large] [--repeat 3]
+                                [--output results.json] [--compare baseline.json]
+                                [--filter boxes]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SIZES = {
+    "small": 1,
+    "medium": 10,
+    "large": 100,
+}
+
+
+# ==============================================================================
+# Synthetic scenes
+# ==============================================================================
+
+
+def scene_of_boxes(n):
+    from compas.geometry import Box
+    from compas.geometry import Translation
+    from compas.scene import Scene
+
+    scene = Scene()
+    group = scene.add_group(name="Boxes")
+    for i in range(n):
+        group.add(Box(0.5), name=f"Box{i}", transformation=Translation.from_vector([i, 0, 0]))
+    return scene
+
+
+def scene_of_spheres(n):
+    from compas.geometry import Sphere
+    from compas.geometry import Translation
+    from compas.scene import Scene
+
+    scene = Scene()
+    group = scene.add_group(name="Spheres")
+    for i in range(n):
+        group.add(Sphere(0.5), name=f"Sphere{i}", transformation=Translation.from_vector([i, 0, 0]))
+    return scene
+
+
+def scene_of_hierarchy(depth, width):
+    from compas.geometry import Box
+    from compas.geometry import Translation
+    from compas.scene import Scene
+
+    scene = Scene()
+    # a chain of ``depth`` levels with ``width`` groups each
+    parents = [scene.add_group(name=f"Level0_{i}") for i in range(width)]
+    for level in range(1, depth):
+        parents = [scene.add_group(name=f"Level{level}_{i}", parent=parent) for i, parent in enumerate(parents)]
+    for parent in parents:
+        parent.add(Box(0.5), name="Leaf", transformation=Translation.from_vector([1, 0, 0]))
+    return scene
+
+
+def grid_mesh(faces):
+    from compas.datastructures import Mesh
+
+    n = max(1, int(faces**0.5))
+    return Mesh.from_meshgrid(dx=1.0, nx=n)
+
+
+def transformations(n):
+    from compas.geometry import Frame
+    from compas.geometry import Transformation
+
+    return [Transformation.from_frame(Frame.from_euler_angles([0.001 * i, 0.002 * i, 0.003 * i], point=[i, 0, 0])) for i in range(n)]
+
+
+# ==============================================================================
+# Cases
+# ==============================================================================
+# Each case takes the scale factor and a temporary folder, prepares its input,
+# and returns a ``(run, paths)`` pair, or a ``(run, paths, faces)`` triple to
+# also report the throughput. Only ``run`` is timed. ``paths`` are the files
+# written by ``run``, or None.
+
+
+def case_stage_from_scene_boxes(scale, folder):
+    from compas_usd.conversions import stage_from_scene
+
+    scene = scene_of_boxes(1000 * scale)
+    path = os.path.join(folder, "boxes.usdc")
+    return (lambda: stage_from_scene(scene, path)), [path]
+
+
+def case_stage_from_scene_boxes_sdf(scale, folder):
+    from compas_usd.conversions import stage_from_scene
+
+    scene = scene_of_boxes(1000 * scale)
+    path = os.path.join(folder, "boxes_sdf.usdc")
+    return (lambda: stage_from_scene(scene, path, backend="sdf")), [path]
+
+
+def case_stage_from_scene_spheres(scale, folder):
+    from compas_usd.conversions import stage_from_scene
+
+    scene = scene_of_spheres(1000 * scale)
+    path = os.path.join(folder, "spheres.usdc")
+    return (lambda: stage_from_scene(scene, path)), [path]
+
+
+def case_stage_from_scene_hierarchy(scale, folder):
+    from compas_usd.conversions import stage_from_scene
+
+    scene = scene_of_hierarchy(depth=50 * scale, width=4)
+    path = os.path.join(folder, "hierarchy.usdc")
+    return (lambda: stage_from_scene(scene, path)), [path]
+
+
+def make_case_file_format(extension):
+    def case(scale, folder):
+        from compas_usd.conversions import stage_from_scene
+
+        scene = scene_of_boxes(1000 * scale)
+        group = scene.add_group(name="Meshes")
+        for i in range(10):
+            group.add(grid_mesh(10000 * scale), name=f"Mesh{i}")
+        path = os.path.join(folder, "scene" + extension)
+        return (lambda: stage_from_scene(scene, path)), [path]
+
+    return case
+
+
+def make_case_processes(processes):
+    def case(scale, folder):
+        from compas.scene import Scene
+
+        from compas_usd.conversions import stage_from_scene
+
+        scene = Scene()
+        for i in range(16):
+            scene.add(grid_mesh(10000 * scale), name=f"Mesh{i}")
+        path = os.path.join(folder, "meshes.usdc")
+        faces = sum(sceneobject.item.number_of_faces() for sceneobject in scene.root.children)
+        return (lambda: stage_from_scene(scene, path, processes=processes)), [path], faces
+
+    return case
+
+
+def prim_from_mesh_lists(stage, path, mesh):
+    # the list-based baseline of prim_from_mesh, authoring the same attributes
+    from compas.itertools import flatten
+    from pxr import UsdGeom
+
+    prim = UsdGeom.Mesh.Define(stage, path)
+    vertices, faces = mesh.to_vertices_and_faces()
+    prim.CreatePointsAttr(vertices)
+    prim.CreateFaceVertexCountsAttr([len(f) for f in faces])
+    prim.CreateFaceVertexIndicesAttr(list(flatten(faces)))
+    prim.CreateExtentAttr([[min(c) for c in zip(*vertices)], [max(c) for c in zip(*vertices)]])
+    return prim
+
+
+def make_case_prim_from_mesh(faces, lists=False):
+    def case(scale, folder):
+        from itertools import count
+
+        from pxr import Usd
+
+        from compas_usd.conversions import prim_from_mesh
+
+        mesh = grid_mesh(faces * scale)
+        convert = prim_from_mesh_lists if lists else prim_from_mesh
+        # only the authoring is timed, every run writes a new prim of one in-memory stage
+        stage = Usd.Stage.CreateInMemory()
+        paths = ("/mesh{}".format(i) for i in count())
+
+        return (lambda: convert(stage, next(paths), mesh)), None, mesh.number_of_faces()
+
+    return case
+
+
+def case_box_from_prim(scale, folder):
+    from compas.geometry import Box
+    from pxr import Usd
+
+    from compas_usd.conversions import box_from_prim
+    from compas_usd.conversions import prim_from_box
+
+    stage = Usd.Stage.CreateInMemory()
+    prims = [prim_from_box(stage, f"/box{i}", Box(0.5)) for i in range(1000 * scale)]
+
+    def run():
+        for prim in prims:
+            box_from_prim(prim)
+        # referencing the stage keeps its prims alive
+        return stage
+
+    return run, None
+
+
+def case_gfmatrix4d_from_transformation(scale, folder):
+    from compas_usd.conversions import gfmatrix4d_from_transformation
+
+    items = transformations(10000 * scale)
+    return (lambda: [gfmatrix4d_from_transformation(t) for t in items]), None
+
+
+def case_vtmatrix4darray_from_transformations(scale, folder):
+    from compas_usd.conversions import vtmatrix4darray_from_transformations
+
+    items = transformations(10000 * scale)
+    return (lambda: vtmatrix4darray_from_transformations(items)), None
+
+
+def case_transformation_from_gfmatrix4d(scale, folder):
+    from compas_usd.conversions import gfmatrix4d_from_transformation
+    from compas_usd.conversions import transformation_from_gfmatrix4d
+
+    items = [gfmatrix4d_from_transformation(t) for t in transformations(10000 * scale)]
+    return (lambda: [transformation_from_gfmatrix4d(m) for m in items]), None
+
+
+def case_transformations_from_vtmatrix4darray(scale, folder):
+    from compas_usd.conversions import transformations_from_vtmatrix4darray
+    from compas_usd.conversions import vtmatrix4darray_from_transformations
+
+    array = vtmatrix4darray_from_transformations(transformations(10000 * scale))
+    return (lambda: transformations_from_vtmatrix4darray(array)), None
+
+
+def make_case_batch(processes):
+    def case(scale, folder):
+        import contextlib
+        import io
+
+        import compas
+        from compas.scene import Scene
+
+        from compas_usd.batch import main
+
+        for i in range(16):
+            scene = Scene()
+            for j in range(4):
+                scene.add(grid_mesh(2500 * scale), name=f"Mesh{j}")
+            compas.json_dump(scene, os.path.join(folder, f"scene{i}.json"))
+        output = os.path.join(folder, "usd")
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                main([os.path.join(folder, "*.json"), "-o", output, "--force", "-p", str(processes)])
+
+        return run, [output]
+
+    return case
+
+
+CASES = {
+    "stage_from_scene/boxes": case_stage_from_scene_boxes,
+    "stage_from_scene/boxes_sdf": case_stage_from_scene_boxes_sdf,
+    "stage_from_scene/spheres": case_stage_from_scene_spheres,
+    "stage_from_scene/hierarchy": case_stage_from_scene_hierarchy,
+    "stage_from_scene/format_usda": make_case_file_format(".usda"),
+    "stage_from_scene/format_usdc": make_case_file_format(".usdc"),
+    "stage_from_scene/format_usdz": make_case_file_format(".usdz"),
+    "stage_from_scene/meshes": make_case_processes(None),
+    "stage_from_scene/meshes_processes_2": make_case_processes(2),
+    "stage_from_scene/meshes_processes_4": make_case_processes(4),
+    "stage_from_scene/meshes_processes_8": make_case_processes(8),
+    "prim_from_mesh/1k": make_case_prim_from_mesh(1000),
+    "prim_from_mesh/10k": make_case_prim_from_mesh(10000),
+    "prim_from_mesh/100k": make_case_prim_from_mesh(100000),
+    "prim_from_mesh/lists_1k": make_case_prim_from_mesh(1000, lists=True),
+    "prim_from_mesh/lists_10k": make_case_prim_from_mesh(10000, lists=True),
+    "prim_from_mesh/lists_100k": make_case_prim_from_mesh(100000, lists=True),
+    "batch/processes_1": make_case_batch(1),
+    "batch/processes_4": make_case_batch(4),
+    "box_from_prim": case_box_from_prim,
+    "transformations/gfmatrix4d_from_transformation": case_gfmatrix4d_from_transformation,
+    "transformations/vtmatrix4darray_from_transformations": case_vtmatrix4darray_from_transformations,
+    "transformations/transformation_from_gfmatrix4d": case_transformation_from_gfmatrix4d,
+    "transformations/transformations_from_vtmatrix4darray": case_transformations_from_vtmatrix4darray,
+}
+
+
+# ==============================================================================
+# Runner
+# ==============================================================================
+
+
+def peak_rss():
+    """Peak resident set size of the current process in bytes, or None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def files_size(paths):
+    size = 0
+    for path in paths or []:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        elif os.path.exists(path):
+            size += os.path.getsize(path)
+    return size
+
+
+def run_case(name, scale, repeat):
+    with tempfile.TemporaryDirectory() as folder:
+        run, paths, *faces = CASES[name](scale, folder)
+        rss_before = peak_rss()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        rss_after = peak_rss()
+        return {
+            "seconds": min(times),
+            "peak_memory": None if rss_before is None else rss_after - rss_before,
+            "file_size": None if paths is None else files_size(paths),
+            "faces_per_second": faces[0] / min(times) if faces else None,
+        }
+
+
+def run_suite(names, scale, repeat):
+    # a fresh process per case keeps peak memory and caches independent
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_case, name, scale, repeat).result()
+        print_result(name, results[name])
+    return results
+
+
+def print_result(name, result, baseline=None):
+    memory = result["peak_memory"]
+    size = result["file_size"]
+    faces_per_second = result.get("faces_per_second")
+    line = "{:<55} {:>10.4f} s {:>10} MB {:>10} KB {:>12} f/s".format(
+        name,
+        result["seconds"],
+        "-" if memory is None else "{:.1f}".format(memory / 1e6),
+        "-" if size is None else "{:.1f}".format(size / 1e3),
+        "-" if faces_per_second is None else "{:.0f}".format(faces_per_second),
+    )
+    if baseline:
+        line += " {:>+8.1f} %".format(100.0 * (result["seconds"] / baseline["seconds"] - 1.0))
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="Scale of the synthetic scenes.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per case, the best is reported.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Compare the wall times against the results in this JSON file.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this string.")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.filter in name]
+    print("{:<55} {:>12} {:>13} {:>13} {:>16}".format("case", "time", "peak memory", "file size", "throughput"))
+    results = run_suite(names, SIZES[args.size], args.repeat)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print("\ncompared to {}".format(args.compare))
+        for name, result in results.items():
+            print_result(name, result, baseline.get(name))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "size": args.size,
+                    "repeat": args.repeat,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
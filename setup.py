@@ -24,7 +24,9 @@ def read(*names, **kwargs):
 
 long_description = read("README.md")
 requirements = read("requirements.txt").split("\n")
-optional_requirements = {}
+optional_requirements = {
+    "textures": ["Pillow"],
+}
 
 setup(
     name="compas_usd",
@@ -0,0 +1,109 @@
+"""Converts COMPAS JSON scenes to USD stages in batch.
+
+Usage:
+    python -m compas_usd scenes/*.json [--output-dir usd] [--format usdc]
+                                       [--processes 8] [--force] [--instancing]
+                                       [--backend usd|sdf]
+
+Inputs are file paths or glob patterns, e.g. ``"scenes/**/*.json"``. Each scene is
+written next to its input, or to ``--output-dir``, with the extension of ``--format``.
+Inputs whose output is newer than the input are skipped, unless ``--force`` is given.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# imported once per worker process, which then converts many scenes
+import compas
+from compas_usd.conversions import stage_from_scene
+
+
+def convert(job):
+    """Converts one scene file, and returns its input path, seconds, output size and error, if any."""
+    input_path, output_path, options = job
+    start = time.perf_counter()
+    try:
+        scene = compas.json_load(input_path)
+        stage_from_scene(scene, output_path, **options)
+    except Exception as e:
+        return input_path, time.perf_counter() - start, 0, "{}: {}".format(type(e).__name__, e)
+    return input_path, time.perf_counter() - start, os.path.getsize(output_path), None
+
+
+def input_paths(patterns):
+    """Returns the files matched by paths or glob patterns, once each, in order."""
+    paths = {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            paths.setdefault(os.path.normpath(path), None)
+    return list(paths)
+
+
+def output_path(input_path, output_dir, file_format):
+    folder = output_dir if output_dir is not None else os.path.dirname(input_path)
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(folder, "{}.{}".format(name, file_format))
+
+
+def is_up_to_date(input_path, output_path):
+    return os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+
+
+def run(jobs, processes):
+    """Converts scenes in a pool of ``processes`` workers, or in this process if ``processes`` is 1."""
+    if processes <= 1:
+        return map(convert, jobs)
+    # forking a process that already runs USD's worker threads can deadlock
+    executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    with executor:
+        # chunks amortize the inter-process overhead of many small scenes
+        return list(executor.map(convert, jobs, chunksize=max(1, len(jobs) // (4 * processes))))
+
+
+def main(argv=None):
+    """Runs the batch converter with command line arguments, and returns the exit code."""
+    parser = argparse.ArgumentParser(prog="python -m compas_usd", description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="COMPAS JSON scene files or glob patterns.")
+    parser.add_argument("-o", "--output-dir", help="Write the stages to this folder instead of next to the inputs.")
+    parser.add_argument("-f", "--format", choices=["usda", "usdc", "usdz"], default="usdc", help="The output format.")
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count() or 1, help="The number of worker processes.")
+    parser.add_argument("--force", action="store_true", help="Convert inputs even if their output is up to date.")
+    parser.add_argument("--instancing", action="store_true", help="Instance items with identical geometry.")
+    parser.add_argument("--backend", choices=["usd", "sdf"], default="usd", help="The authoring backend.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    options = {"instancing": args.instancing, "backend": args.backend}
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = []
+    skipped = 0
+    for path in input_paths(args.inputs):
+        target = output_path(path, args.output_dir, args.format)
+        if not args.force and os.path.exists(path) and is_up_to_date(path, target):
+            skipped += 1
+        else:
+            jobs.append((path, target, options))
+
+    converted = failed = size = 0
+    for path, seconds, bytes_written, error in run(jobs, min(args.processes, len(jobs))):
+        if error is not None:
+            failed += 1
+            print("failed: {}: {}".format(path, error), file=sys.stderr)
+        else:
+            converted += 1
+            size += bytes_written
+
+    seconds = time.perf_counter() - start
+    print(
+        "converted {} scenes, skipped {}, failed {} in {:.2f} s ({:.1f} scenes/s, {:.1f} MB written)".format(
+            converted, skipped, failed, seconds, converted / seconds if seconds else 0.0, size / 1e6
+        )
+    )
+    return 1 if failed else 0
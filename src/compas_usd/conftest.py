@@ -12,7 +12,11 @@ from compas.geometry import Transformation
 from compas.geometry import Scale
 from compas.geometry import allclose
 from compas.geometry import Box
+from compas.geometry import Capsule
+from compas.geometry import Cone
+from compas.geometry import Cylinder
 from compas.geometry import Sphere
+from compas.geometry import Torus
 
 
 @pytest.fixture(autouse=True)
@@ -29,6 +33,10 @@ def add_imports(doctest_namespace):
     doctest_namespace["Transformation"] = Transformation
     doctest_namespace["Box"] = Box
     doctest_namespace["Sphere"] = Sphere
+    doctest_namespace["Cylinder"] = Cylinder
+    doctest_namespace["Cone"] = Cone
+    doctest_namespace["Capsule"] = Capsule
+    doctest_namespace["Torus"] = Torus
     doctest_namespace["Frame"] = Frame
 
     stage = Usd.Stage.CreateInMemory()
@@ -10,32 +10,146 @@ compas_usd.conversions
 """
 from __future__ import absolute_import
 
-from .geometry import prim_from_box, box_from_prim, prim_from_cylinder, prim_from_sphere, prim_from_mesh, prim_from_transformation, prim_default
+from .geometry import (
+    prim_from_box,
+    box_from_prim,
+    prim_from_cylinder,
+    cylinder_from_prim,
+    prim_from_cone,
+    cone_from_prim,
+    prim_from_capsule,
+    capsule_from_prim,
+    prim_from_torus,
+    torus_from_prim,
+    prim_from_sphere,
+    sphere_from_prim,
+    prim_from_mesh,
+    prim_from_mesh_arrays,
+    prim_from_mesh_sequence,
+    prim_from_mesh_lods,
+    prim_from_mesh_arrays_lods,
+    decimated_mesh_arrays,
+    arrays_from_mesh,
+    mesh_from_prim,
+    mesh_arrays_from_prim,
+    prim_from_surface,
+    surface_from_prim,
+    surface_parameters_from_prim,
+    prim_from_transformation,
+    prim_default,
+)
 from .transformations import (
     gfmatrix4d_from_transformation,
     transformation_from_gfmatrix4d,
     gfvec3f_and_gfquatd_from_frame,
+    vtmatrix4darray_from_transformations,
+    matrices_from_vtmatrix4darray,
+    transformations_from_vtmatrix4darray,
+    gfvec3f_and_gfquatd_from_frames,
     xform_rotate_from_frame,
     apply_transformation_on_prim,
+    apply_transformations_on_prim,
     apply_rotate_and_translate_on_prim,
     frame_and_scale_from_prim,
+    transformations_from_prims,
+    matrices_from_transformations,
+    matrices_from_frames,
+    decompose_matrices,
+    quaternions_from_rotations,
+)
+from .specs import (
+    spec_define,
+    spec_from_box,
+    spec_from_sphere,
+    spec_from_cylinder,
+    spec_from_cone,
+    spec_from_capsule,
+    spec_from_torus,
+    spec_from_mesh,
+    spec_from_mesh_arrays,
+    spec_from_surface,
+    spec_from_transformation,
+)
+from .scene import (
+    stage_from_scene,
+    stage_from_scene_streaming,
+    stage_from_scene_incremental,
+    stage_from_scene_states,
+    bind_materials,
+    register_converter,
+    unregister_converter,
+    scene_from_stage,
+    USDSceneObject,
 )
-from .scene import stage_from_scene
+from .instancing import prim_from_point_instances
+from .bounds import boxes_from_prims
+from .profiling import ExportProfile
 
 __all__ = [
     "prim_from_box",
     "box_from_prim",
     "prim_from_cylinder",
+    "cylinder_from_prim",
+    "prim_from_cone",
+    "cone_from_prim",
+    "prim_from_capsule",
+    "capsule_from_prim",
+    "prim_from_torus",
+    "torus_from_prim",
     "prim_from_sphere",
+    "sphere_from_prim",
     "prim_from_mesh",
+    "prim_from_mesh_arrays",
+    "prim_from_mesh_sequence",
+    "prim_from_mesh_lods",
+    "prim_from_mesh_arrays_lods",
+    "decimated_mesh_arrays",
+    "arrays_from_mesh",
+    "mesh_from_prim",
+    "mesh_arrays_from_prim",
+    "prim_from_surface",
+    "surface_from_prim",
+    "surface_parameters_from_prim",
     "prim_from_transformation",
     "prim_default",
     "gfmatrix4d_from_transformation",
     "transformation_from_gfmatrix4d",
     "gfvec3f_and_gfquatd_from_frame",
+    "vtmatrix4darray_from_transformations",
+    "matrices_from_vtmatrix4darray",
+    "transformations_from_vtmatrix4darray",
+    "gfvec3f_and_gfquatd_from_frames",
     "xform_rotate_from_frame",
     "apply_transformation_on_prim",
+    "apply_transformations_on_prim",
     "apply_rotate_and_translate_on_prim",
     "frame_and_scale_from_prim",
+    "transformations_from_prims",
+    "matrices_from_transformations",
+    "matrices_from_frames",
+    "decompose_matrices",
+    "quaternions_from_rotations",
+    "spec_define",
+    "spec_from_box",
+    "spec_from_sphere",
+    "spec_from_cylinder",
+    "spec_from_cone",
+    "spec_from_capsule",
+    "spec_from_torus",
+    "spec_from_mesh",
+    "spec_from_mesh_arrays",
+    "spec_from_surface",
+    "spec_from_transformation",
     "stage_from_scene",
+    "stage_from_scene_streaming",
+    "stage_from_scene_incremental",
+    "stage_from_scene_states",
+    "bind_materials",
+    "register_converter",
+    "unregister_converter",
+    "scene_from_stage",
+    "USDSceneObject",
+    "prim_from_point_instances",
+    "boxes_from_prims",
+    "ExportProfile",
 ]
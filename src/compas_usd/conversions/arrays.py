@@ -0,0 +1,54 @@
+import numpy as np
+from pxr import Vt
+
+
+def vtarray_from_numpy(vtarray_type, array, dtype):
+    """Converts a NumPy array to a ``pxr.Vt`` array in one bulk copy.
+
+    Parameters
+    ----------
+    vtarray_type : type
+        The ``pxr.Vt`` array type, e.g. ``Vt.Vec3fArray`` or ``Vt.IntArray``.
+    array : array-like
+        The values. Vector and matrix types expect a 2D or 3D array.
+    dtype : :class:`numpy.dtype`
+        The scalar type matching ``vtarray_type``.
+
+    Returns
+    -------
+    ``pxr.Vt.Array``
+
+    Examples
+    --------
+    >>> from pxr import Vt
+    >>> vtarray_from_numpy(Vt.IntArray, [3, 3], np.int32)
+    Vt.IntArray(2, (3, 3))
+    """
+    array = np.ascontiguousarray(array, dtype=dtype)
+    if hasattr(vtarray_type, "FromNumpy"):
+        return vtarray_type.FromNumpy(array)
+    return vtarray_type(array.tolist())
+
+
+def extent_from_points(points):
+    """Returns the axis-aligned bounds of points as a ``pxr.Vt.Vec3fArray`` of two corners.
+
+    Parameters
+    ----------
+    points : array-like
+        The points, shape (N, 3).
+
+    Returns
+    -------
+    ``pxr.Vt.Vec3fArray``
+        The minimum and maximum corner, as written to the ``extent`` attribute.
+
+    Examples
+    --------
+    >>> extent_from_points([[0, 0, 0], [1, 2, 0], [-1, 0, 3]])
+    Vt.Vec3fArray(2, (Gf.Vec3f(-1.0, 0.0, 0.0), Gf.Vec3f(1.0, 2.0, 3.0)))
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    if not len(points):
+        return Vt.Vec3fArray()
+    return vtarray_from_numpy(Vt.Vec3fArray, np.stack([points.min(axis=0), points.max(axis=0)]), np.float32)
@@ -0,0 +1,58 @@
+from pxr import Gf
+from pxr import Usd
+from pxr import UsdGeom
+
+from compas.geometry import Box
+from compas.geometry import Frame
+
+
+def boxes_from_prims(prims, time=None, purposes=None, cache=None):
+    """Returns the world space bounding boxes of prims.
+
+    All bounds are computed with one :class:`UsdGeom.BBoxCache`, which uses the
+    authored extents and caches the bounds of shared subtrees, so querying many
+    prims of a stage does not read their points.
+
+    Parameters
+    ----------
+    prims : list[:class:`pxr.Usd.Prim` | :class:`pxr.Usd.SchemaBase`]
+        The prims, or schema objects such as the ones returned by ``prim_from_*``.
+    time : float, optional
+        The time code. Defaults to the default time code.
+    purposes : list[str], optional
+        The purposes to include, e.g. ``["default", "proxy"]``. Defaults to ``["default"]``.
+    cache : :class:`UsdGeom.BBoxCache`, optional
+        A cache to reuse between calls. If given, ``time`` and ``purposes`` are ignored.
+
+    Returns
+    -------
+    list[:class:`compas.geometry.Box` | None]
+        The oriented bounding box of every prim, or None if the prim has no geometry.
+
+    Examples
+    --------
+    >>> from compas_usd.conversions import prim_from_sphere
+    >>> prim = prim_from_sphere(stage, "/bounds/sphere", Sphere(2.0, point=(1, 2, 3)))
+    >>> box = boxes_from_prims([prim])[0]
+    >>> box.xsize, box.frame.point
+    (4.0, Point(x=1.0, y=2.0, z=3.0))
+    """
+    if cache is None:
+        time = Usd.TimeCode.Default() if time is None else Usd.TimeCode(time)
+        cache = UsdGeom.BBoxCache(time, purposes or [UsdGeom.Tokens.default_], useExtentsHint=True)
+    return [box_from_bbox3d(cache.ComputeWorldBound(prim.GetPrim())) for prim in prims]
+
+
+def box_from_bbox3d(bbox):
+    """Converts a :class:`Gf.BBox3d` to a :class:`compas.geometry.Box`, or None if it is empty."""
+    box_range = bbox.GetRange()
+    if box_range.IsEmpty():
+        return None
+    matrix = bbox.GetMatrix()
+    size = box_range.GetSize()
+    xaxis = matrix.TransformDir(Gf.Vec3d(1, 0, 0))
+    yaxis = matrix.TransformDir(Gf.Vec3d(0, 1, 0))
+    zaxis = matrix.TransformDir(Gf.Vec3d(0, 0, 1))
+    center = matrix.Transform(box_range.GetMidpoint())
+    frame = Frame(list(center), list(xaxis), list(yaxis))
+    return Box(size[0] * xaxis.GetLength(), size[1] * yaxis.GetLength(), size[2] * zaxis.GetLength(), frame=frame)
@@ -1,18 +1,30 @@
+from itertools import chain
+
+import numpy as np
+from pxr import Sdf
 from pxr import UsdGeom
+from pxr import Vt
 from compas.geometry import Frame
+from compas.geometry import NurbsSurface
 from compas.geometry import Box
-from compas.itertools import flatten
-from compas.geometry import transpose_matrix
-
+from compas.geometry import Capsule
+from compas.geometry import Cone
+from compas.geometry import Cylinder
+from compas.geometry import Sphere
+from compas.geometry import Torus
+from compas.datastructures import Mesh
+from compas.plugins import PluginNotInstalledError
+
+from .arrays import extent_from_points
+from .arrays import vtarray_from_numpy
 from .transformations import apply_rotate_and_translate_on_prim
 from .transformations import apply_transformation_on_prim
 from .transformations import frame_and_scale_from_prim
 
 
-def unflatten(array, n):
-    if len(array) % n:
-        raise ValueError("The length of the array must be a factor of n: %d %% %d == 0" % (len(array), n))
-    return [array[i : (i + n)] for i in range(0, len(array), n)]  # noqa E203
+TORUS_KEY = "compas:torus"
+LOD_VARIANT_SET = "lod"
+MESH_LODS = {"high": None, "medium": 32, "proxy": 8}
 
 
 def prim_from_box(stage, path, box):
@@ -27,6 +39,7 @@ def prim_from_box(stage, path, box):
 
     prim = UsdGeom.Cube.Define(stage, path)
     prim.GetPrim().GetAttribute("size").Set(1.0)
+    prim.CreateExtentAttr(_axial_extent(0.5, 0.5))
     UsdGeom.XformCommonAPI(prim).SetScale((box.xsize, box.ysize, box.zsize))
     apply_rotate_and_translate_on_prim(prim, box.frame)
     return prim
@@ -37,15 +50,15 @@ def box_from_prim(prim):
 
     Examples
     --------
-    >>> box = Box(Frame.worldXY(), 1, 1, 1)
+    >>> box = Box(1, 1, 1, frame=Frame.worldXY())
     >>> prim = prim_from_box(stage, "/box", box)
     >>> box_from_prim(prim)
-    Box(Frame(Point(0.000, 0.000, 0.000), Vector(1.000, -0.000, 0.000), Vector(0.000, 1.000, -0.000)), 1.0, 1.0, 1.0)
+    Box(xsize=1.0, ysize=1.0, zsize=1.0, frame=Frame(point=Point(x=0.0, y=0.0, z=0.0), xaxis=Vector(x=1.0, y=-0.0, z=0.0), yaxis=Vector(x=0.0, y=1.0, z=-0.0)))
     """
     size = prim.GetPrim().GetAttribute("size").Get()
     frame, scale = frame_and_scale_from_prim(prim)
     xsize, ysize, zsize = scale
-    return Box(frame, xsize * size, ysize * size, zsize * size)
+    return Box(xsize * size, ysize * size, zsize * size, frame=frame)
 
 
 def prim_from_cylinder(stage, path, cylinder):
@@ -53,18 +66,164 @@ def prim_from_cylinder(stage, path, cylinder):
 
     Examples
     --------
-    >>>
+    >>> prim_from_cylinder(stage, "/cylinder", Cylinder(1.0, 3.0))
+    UsdGeom.Cylinder(Usd.Prim(</cylinder>))
     """
     prim = UsdGeom.Cylinder.Define(stage, path)
     prim.GetHeightAttr().Set(cylinder.height)
     prim.GetRadiusAttr().Set(cylinder.radius)
     prim.GetAxisAttr().Set("Z")
+    prim.CreateExtentAttr(_axial_extent(cylinder.radius, 0.5 * cylinder.height))
     # How to specify the refinement level for the render view? The following
     # does not work: UsdImagingDelegate.SetRefineLevel(path, 2)
-    apply_rotate_and_translate_on_prim(prim, Frame.from_plane(cylinder.plane))
+    apply_rotate_and_translate_on_prim(prim, cylinder.frame)
+    return prim
+
+
+def cylinder_from_prim(prim):
+    """Returns a :class:`compas.geometry.Cylinder`
+
+    Examples
+    --------
+    >>> cylinder = Cylinder(1.0, 3.0, frame=Frame([1, 2, 3], [0, 1, 0], [-1, 0, 0]))
+    >>> prim = prim_from_cylinder(stage, "/cylinder", cylinder)
+    >>> result = cylinder_from_prim(prim)
+    >>> result.radius, result.height, allclose(result.frame.zaxis, cylinder.frame.zaxis)
+    (1.0, 3.0, True)
+    """
+    prim = UsdGeom.Cylinder(prim)
+    frame, _ = frame_and_scale_from_prim(prim)
+    return Cylinder(prim.GetRadiusAttr().Get(), prim.GetHeightAttr().Get(), frame=_frame_along_axis(frame, prim.GetAxisAttr().Get()))
+
+
+def prim_from_cone(stage, path, cone):
+    """Returns a :class:`UsdGeom.Cone`
+
+    A compas cone stands on its frame, a USD cone is centered on its origin.
+
+    Examples
+    --------
+    >>> prim_from_cone(stage, "/cone", Cone(1.0, 3.0))
+    UsdGeom.Cone(Usd.Prim(</cone>))
+    """
+    prim = UsdGeom.Cone.Define(stage, path)
+    prim.GetHeightAttr().Set(cone.height)
+    prim.GetRadiusAttr().Set(cone.radius)
+    prim.GetAxisAttr().Set("Z")
+    prim.CreateExtentAttr(_axial_extent(cone.radius, 0.5 * cone.height))
+    apply_rotate_and_translate_on_prim(prim, _cone_center_frame(cone.frame, cone.height))
+    return prim
+
+
+def cone_from_prim(prim):
+    """Returns a :class:`compas.geometry.Cone`
+
+    Examples
+    --------
+    >>> cone = Cone(1.0, 3.0, frame=Frame([1, 2, 3], [1, 0, 0], [0, 1, 0]))
+    >>> result = cone_from_prim(prim_from_cone(stage, "/cone", cone))
+    >>> result.radius, result.height, result.frame.point
+    (1.0, 3.0, Point(x=1.0, y=2.0, z=3.0))
+    """
+    prim = UsdGeom.Cone(prim)
+    height = prim.GetHeightAttr().Get()
+    frame, _ = frame_and_scale_from_prim(prim)
+    return Cone(prim.GetRadiusAttr().Get(), height, frame=_cone_center_frame(_frame_along_axis(frame, prim.GetAxisAttr().Get()), -height))
+
+
+def _cone_center_frame(frame, height):
+    return Frame(frame.point + frame.zaxis * (0.5 * height), frame.xaxis, frame.yaxis)
+
+
+def prim_from_capsule(stage, path, capsule):
+    """Returns a :class:`UsdGeom.Capsule`
+
+    Examples
+    --------
+    >>> prim_from_capsule(stage, "/capsule", Capsule(1.0, 3.0))
+    UsdGeom.Capsule(Usd.Prim(</capsule>))
+    """
+    prim = UsdGeom.Capsule.Define(stage, path)
+    prim.GetHeightAttr().Set(capsule.height)
+    prim.GetRadiusAttr().Set(capsule.radius)
+    prim.GetAxisAttr().Set("Z")
+    prim.CreateExtentAttr(_axial_extent(capsule.radius, 0.5 * capsule.height + capsule.radius))
+    apply_rotate_and_translate_on_prim(prim, capsule.frame)
+    return prim
+
+
+def capsule_from_prim(prim):
+    """Returns a :class:`compas.geometry.Capsule`
+
+    Examples
+    --------
+    >>> result = capsule_from_prim(prim_from_capsule(stage, "/capsule", Capsule(1.0, 3.0)))
+    >>> result.radius, result.height
+    (1.0, 3.0)
+    """
+    prim = UsdGeom.Capsule(prim)
+    frame, _ = frame_and_scale_from_prim(prim)
+    return Capsule(prim.GetRadiusAttr().Get(), prim.GetHeightAttr().Get(), frame=_frame_along_axis(frame, prim.GetAxisAttr().Get()))
+
+
+def prim_from_torus(stage, path, torus, u=32, v=16):
+    """Returns a ``pxr.UsdGeom.Mesh`` of a torus
+
+    USD has no torus schema. The torus is tessellated in its own frame, and its
+    radii are kept in the ``customData`` of the prim for :func:`torus_from_prim`.
+
+    Examples
+    --------
+    >>> prim = prim_from_torus(stage, "/torus", Torus(2.0, 0.5), u=8, v=4)
+    >>> len(prim.GetPointsAttr().Get())
+    32
+    """
+    prim = prim_from_mesh_arrays(stage, path, *_torus_arrays(torus, u, v))
+    prim.GetPrim().SetCustomDataByKey(TORUS_KEY, {"radius_axis": torus.radius_axis, "radius_pipe": torus.radius_pipe})
+    apply_rotate_and_translate_on_prim(prim, torus.frame)
     return prim
 
 
+def _torus_arrays(torus, u, v):
+    # tessellated around the origin, the frame is written as transform ops
+    vertices, faces = Torus(torus.radius_axis, torus.radius_pipe).to_vertices_and_faces(u=u, v=v)
+    points = np.array(vertices, dtype=np.float32)
+    face_vertex_counts = np.fromiter((len(face) for face in faces), dtype=np.int32, count=len(faces))
+    face_vertex_indices = np.fromiter(chain.from_iterable(faces), dtype=np.int32)
+    return points, face_vertex_counts, face_vertex_indices
+
+
+def torus_from_prim(prim):
+    """Returns a :class:`compas.geometry.Torus` of a mesh prim written by :func:`prim_from_torus`
+
+    Examples
+    --------
+    >>> result = torus_from_prim(prim_from_torus(stage, "/torus", Torus(2.0, 0.5)))
+    >>> result.radius_axis, result.radius_pipe
+    (2.0, 0.5)
+    """
+    prim = prim.GetPrim()
+    data = prim.GetCustomDataByKey(TORUS_KEY)
+    if not data:
+        raise ValueError("The prim is not a torus: {}".format(prim.GetPath()))
+    frame, _ = frame_and_scale_from_prim(prim)
+    return Torus(data["radius_axis"], data["radius_pipe"], frame=frame)
+
+
+def _axial_extent(radius, half_height):
+    # the extent of an implicit shape around the z axis
+    return Vt.Vec3fArray([(-radius, -radius, -half_height), (radius, radius, half_height)])
+
+
+def _frame_along_axis(frame, axis):
+    # compas shapes are aligned with the z axis of their frame
+    if axis == UsdGeom.Tokens.x:
+        return Frame(frame.point, frame.yaxis, frame.zaxis)
+    if axis == UsdGeom.Tokens.y:
+        return Frame(frame.point, frame.zaxis, frame.xaxis)
+    return frame
+
+
 def prim_from_sphere(stage, path, sphere):
     """Returns a ``pxr.UsdGeom.Sphere``
 
@@ -76,13 +235,32 @@ def prim_from_sphere(stage, path, sphere):
     """
     prim = UsdGeom.Sphere.Define(stage, path)
     prim.GetPrim().GetAttribute("radius").Set(sphere.radius)
+    prim.CreateExtentAttr(_axial_extent(sphere.radius, sphere.radius))
     UsdGeom.XformCommonAPI(prim).SetTranslate(tuple(sphere.frame.point))
     return prim
 
 
+def sphere_from_prim(prim):
+    """Returns a :class:`compas.geometry.Sphere`
+
+    Examples
+    --------
+    >>> prim = prim_from_sphere(stage, "/sphere", Sphere(5, point=[1, 2, 3]))
+    >>> sphere = sphere_from_prim(prim)
+    >>> sphere.radius, sphere.frame.point
+    (5.0, Point(x=1.0, y=2.0, z=3.0))
+    """
+    prim = UsdGeom.Sphere(prim)
+    frame, _ = frame_and_scale_from_prim(prim)
+    return Sphere(prim.GetRadiusAttr().Get(), frame=frame)
+
+
 def prim_from_mesh(stage, path, mesh):
     """Returns a ``pxr.UsdGeom.Mesh``
 
+    The vertex and face data is collected into contiguous NumPy buffers with
+    :func:`arrays_from_mesh` and authored in bulk with :func:`prim_from_mesh_arrays`.
+
     Examples
     --------
     >>> box = Box(Frame.worldXY(), 1, 1, 1)
@@ -90,14 +268,377 @@ def prim_from_mesh(stage, path, mesh):
     >>> prim_from_mesh(stage, "/mesh", mesh)
     UsdGeom.Mesh(Usd.Prim(</mesh>))
     """
+    points, face_vertex_counts, face_vertex_indices = arrays_from_mesh(mesh)
+    return prim_from_mesh_arrays(stage, path, points, face_vertex_counts, face_vertex_indices)
+
+
+def prim_from_mesh_arrays(stage, path, points, face_vertex_counts, face_vertex_indices):
+    """Returns a ``pxr.UsdGeom.Mesh`` authored from flat arrays.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the mesh prim.
+    points : array-like
+        The vertex coordinates, shape (V, 3).
+    face_vertex_counts : array-like
+        The number of vertices per face, shape (F,).
+    face_vertex_indices : array-like
+        The vertex indices of all faces, concatenated.
+
+    Returns
+    -------
+    ``pxr.UsdGeom.Mesh``
+
+    Examples
+    --------
+    >>> points = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]])
+    >>> prim = prim_from_mesh_arrays(stage, "/quad", points, [4], [0, 1, 2, 3])
+    >>> prim.GetFaceVertexCountsAttr().Get()
+    Vt.IntArray(1, (4,))
+    """
+    prim = UsdGeom.Mesh.Define(stage, path)
+    prim.CreatePointsAttr(vtarray_from_numpy(Vt.Vec3fArray, points, np.float32))
+    prim.CreateFaceVertexCountsAttr(vtarray_from_numpy(Vt.IntArray, face_vertex_counts, np.int32))
+    prim.CreateFaceVertexIndicesAttr(vtarray_from_numpy(Vt.IntArray, face_vertex_indices, np.int32))
+    prim.CreateExtentAttr(extent_from_points(points))
+    return prim
+
+
+def prim_from_mesh_sequence(stage, path, meshes, start_time=0.0, time_step=1.0, chunk_size=100):
+    """Returns a ``pxr.UsdGeom.Mesh`` with time-sampled points, e.g. of deforming meshes.
+
+    The meshes are consumed one at a time. The points of every mesh and their extent
+    are written as time samples. The face topology is compared with the previous mesh and written
+    only when it changes: if it stays the same for the whole sequence, the face vertex
+    counts and indices are written once as static values, otherwise as time samples
+    at the frames where they change.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the mesh prim.
+    meshes : iterable[:class:`compas.datastructures.Mesh`]
+        The mesh of every frame.
+    start_time : float, optional
+        The time code of the first frame.
+    time_step : float, optional
+        The time code increment per frame.
+    chunk_size : int, optional
+        The number of frames written per ``Sdf.ChangeBlock``.
+
+    Returns
+    -------
+    ``pxr.UsdGeom.Mesh``
+
+    Examples
+    --------
+    >>> meshes = (Mesh.from_meshgrid(dx=1.0 + i, nx=2) for i in range(10))
+    >>> prim = prim_from_mesh_sequence(stage, "/mesh", meshes)
+    >>> prim.GetPointsAttr().GetNumTimeSamples(), prim.GetFaceVertexIndicesAttr().GetNumTimeSamples()
+    (10, 0)
+    """
+    meshes = iter(meshes)
+    mesh = next(meshes, None)
+    if mesh is None:
+        raise ValueError("A mesh sequence needs at least one mesh.")
+    points, face_vertex_counts, face_vertex_indices = arrays_from_mesh(mesh)
+    prim = prim_from_mesh_arrays(stage, path, points, face_vertex_counts, face_vertex_indices)
+    # the static points would be shadowed by the time samples anyway
+    prim.GetPointsAttr().Clear()
+    prim.GetPointsAttr().Set(vtarray_from_numpy(Vt.Vec3fArray, points, np.float32), start_time)
+    prim.GetExtentAttr().Clear()
+    prim.GetExtentAttr().Set(extent_from_points(points), start_time)
+
+    layer = stage.GetEditTarget().GetLayer()
+    points_path = prim.GetPointsAttr().GetPath()
+    extent_path = prim.GetExtentAttr().GetPath()
+    counts_attr = prim.GetFaceVertexCountsAttr()
+    indices_attr = prim.GetFaceVertexIndicesAttr()
+    first_topology = face_vertex_counts, face_vertex_indices
+    topology_varies = False
+
+    time = float(start_time)
+    done = False
+    while not done:
+        with Sdf.ChangeBlock():
+            for _ in range(chunk_size):
+                mesh = next(meshes, None)
+                if mesh is None:
+                    done = True
+                    break
+                time += time_step
+                points, counts, indices = arrays_from_mesh(mesh)
+                layer.SetTimeSample(points_path, time, vtarray_from_numpy(Vt.Vec3fArray, points, np.float32))
+                layer.SetTimeSample(extent_path, time, extent_from_points(points))
+                if np.array_equal(counts, face_vertex_counts) and np.array_equal(indices, face_vertex_indices):
+                    continue
+                if not topology_varies:
+                    # from now on the topology is sampled, including the one of the first frame
+                    topology_varies = True
+                    _set_topology_sample(layer, counts_attr, indices_attr, start_time, *first_topology)
+                _set_topology_sample(layer, counts_attr, indices_attr, time, counts, indices)
+                face_vertex_counts, face_vertex_indices = counts, indices
+    return prim
+
+
+def _set_topology_sample(layer, counts_attr, indices_attr, time, face_vertex_counts, face_vertex_indices):
+    layer.SetTimeSample(counts_attr.GetPath(), time, vtarray_from_numpy(Vt.IntArray, face_vertex_counts, np.int32))
+    layer.SetTimeSample(indices_attr.GetPath(), time, vtarray_from_numpy(Vt.IntArray, face_vertex_indices, np.int32))
+
+
+def prim_from_mesh_lods(stage, path, mesh, lods=None):
+    """Returns a ``pxr.UsdGeom.Mesh`` with a ``lod`` variant set of decimated versions of a mesh.
+
+    See :func:`prim_from_mesh_arrays_lods`.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the mesh prim.
+    mesh : :class:`compas.datastructures.Mesh`
+        The mesh.
+    lods : dict[str, int | None], optional
+        The decimation resolution by variant name. Defaults to :data:`MESH_LODS`.
+
+    Returns
+    -------
+    ``pxr.UsdGeom.Mesh``
+
+    Examples
+    --------
+    >>> prim = prim_from_mesh_lods(stage, "/lods", Mesh.from_meshgrid(dx=10, nx=40))
+    >>> prim.GetPrim().GetVariantSet("lod").GetVariantNames()
+    ['high', 'medium', 'proxy']
+    """
+    return prim_from_mesh_arrays_lods(stage, path, *arrays_from_mesh(mesh), lods=lods)
+
+
+def prim_from_mesh_arrays_lods(stage, path, points, face_vertex_counts, face_vertex_indices, lods=None):
+    """Returns a ``pxr.UsdGeom.Mesh`` with a ``lod`` variant set of decimated versions of flat mesh arrays.
+
+    Every variant authors its own points, faces and extent, see :func:`decimated_mesh_arrays`.
+    The variant named ``"proxy"`` is also tagged with ``purpose = "proxy"``, so renderers
+    that only draw the default purpose skip it. The first variant is selected.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the mesh prim.
+    points : array-like
+        The vertex coordinates, shape (V, 3).
+    face_vertex_counts : array-like
+        The number of vertices per face, shape (F,).
+    face_vertex_indices : array-like
+        The vertex indices of all faces, concatenated.
+    lods : dict[str, int | None], optional
+        The decimation resolution by variant name, None for the full mesh.
+        Defaults to :data:`MESH_LODS`.
+
+    Returns
+    -------
+    ``pxr.UsdGeom.Mesh``
+    """
+    lods = MESH_LODS if lods is None else lods
     prim = UsdGeom.Mesh.Define(stage, path)
-    vertices, faces = mesh.to_vertices_and_faces()
-    prim.CreatePointsAttr(vertices)
-    prim.CreateFaceVertexCountsAttr([len(f) for f in faces])
-    prim.CreateFaceVertexIndicesAttr(list(flatten(faces)))
+    variant_set = prim.GetPrim().GetVariantSets().AddVariantSet(LOD_VARIANT_SET)
+    for name, resolution in lods.items():
+        arrays = (points, face_vertex_counts, face_vertex_indices)
+        if resolution is not None:
+            arrays = decimated_mesh_arrays(*arrays, resolution)
+        variant_set.AddVariant(name)
+        variant_set.SetVariantSelection(name)
+        with variant_set.GetVariantEditContext():
+            prim_from_mesh_arrays(stage, path, *arrays)
+            if name == "proxy":
+                prim.CreatePurposeAttr(UsdGeom.Tokens.proxy)
+    if lods:
+        variant_set.SetVariantSelection(next(iter(lods)))
     return prim
 
 
+def decimated_mesh_arrays(points, face_vertex_counts, face_vertex_indices, resolution):
+    """Returns a decimated copy of flat mesh arrays, by vertex clustering.
+
+    The bounding box of the points is divided into cubic cells, ``resolution`` along
+    its longest side. The vertices in each cell are merged into their mean, and faces
+    that collapse to fewer than three vertices are removed, all in array operations.
+
+    Parameters
+    ----------
+    points : array-like
+        The vertex coordinates, shape (V, 3).
+    face_vertex_counts : array-like
+        The number of vertices per face, shape (F,).
+    face_vertex_indices : array-like
+        The vertex indices of all faces, concatenated.
+    resolution : int
+        The number of cells along the longest side of the bounding box.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The points (float32), the face vertex counts (int32) and the face vertex indices (int32).
+
+    Examples
+    --------
+    >>> points, counts, indices = arrays_from_mesh(Mesh.from_meshgrid(dx=10, nx=40))
+    >>> points, counts, indices = decimated_mesh_arrays(points, counts, indices, 10)
+    >>> len(points), len(counts)
+    (121, 100)
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    counts = np.asarray(face_vertex_counts, dtype=np.int64)
+    corners = np.asarray(face_vertex_indices, dtype=np.int64)
+    if not len(points) or not len(counts):
+        return points.astype(np.float32), counts.astype(np.int32), corners.astype(np.int32)
+
+    low = points.min(axis=0)
+    size = float((points.max(axis=0) - low).max()) or 1.0
+    cells = np.floor((points - low) * (resolution / size)).astype(np.int64)
+    _, cluster, members = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.reshape(-1)
+    centers = np.stack([np.bincount(cluster, weights=points[:, i], minlength=len(members)) for i in range(3)], axis=1)
+    centers /= members[:, None]
+
+    # drop corners equal to the next corner of their face, then faces with less than 3 corners
+    corners = cluster[corners]
+    ends = np.cumsum(counts)
+    face = np.repeat(np.arange(len(counts)), counts)
+    following = np.arange(1, len(corners) + 1)
+    wrap = following == ends[face]
+    following[wrap] = (ends - counts)[face[wrap]]
+    keep = corners != corners[following]
+    new_counts = np.bincount(face, weights=keep, minlength=len(counts)).astype(np.int64)
+    valid = new_counts >= 3
+    keep &= valid[face]
+
+    used, indices = np.unique(corners[keep], return_inverse=True)
+    return centers[used].astype(np.float32), new_counts[valid].astype(np.int32), indices.reshape(-1).astype(np.int32)
+
+
+def arrays_from_mesh(mesh):
+    """Returns the vertex and face data of a mesh as contiguous NumPy arrays.
+
+    Unlike :meth:`compas.datastructures.Mesh.to_vertices_and_faces`, no intermediate
+    lists of coordinates or faces are built. Vertex keys that are not contiguous
+    (e.g. after deleting vertices) are remapped to indices in one array operation.
+
+    Parameters
+    ----------
+    mesh : :class:`compas.datastructures.Mesh`
+        The mesh.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The points (float32, shape (V, 3)), the face vertex counts (int32, shape (F,))
+        and the face vertex indices (int32).
+
+    Examples
+    --------
+    >>> mesh = Mesh.from_vertices_and_faces([[0, 0, 0], [1, 0, 0], [1, 1, 0]], [[0, 1, 2]])
+    >>> points, counts, indices = arrays_from_mesh(mesh)
+    >>> points.shape, counts.tolist(), indices.tolist()
+    ((3, 3), [3], [0, 1, 2])
+    """
+    default = mesh.default_vertex_attributes
+    x, y, z = default.get("x", 0.0), default.get("y", 0.0), default.get("z", 0.0)
+    vertices = mesh.vertex
+    faces = mesh.face
+
+    coordinates = chain.from_iterable((attr.get("x", x), attr.get("y", y), attr.get("z", z)) for attr in vertices.values())
+    points = np.fromiter(coordinates, dtype=np.float32, count=3 * len(vertices)).reshape(-1, 3)
+
+    face_vertex_counts = np.fromiter(map(len, faces.values()), dtype=np.int32, count=len(faces))
+    face_vertex_indices = np.fromiter(chain.from_iterable(faces.values()), dtype=np.int64, count=int(face_vertex_counts.sum()))
+
+    keys = np.fromiter(vertices.keys(), dtype=np.int64, count=len(vertices))
+    if not np.array_equal(keys, np.arange(len(keys))):
+        index = np.empty(int(keys.max()) + 1, dtype=np.int64)
+        index[keys] = np.arange(len(keys))
+        face_vertex_indices = index[face_vertex_indices]
+
+    return points, face_vertex_counts, face_vertex_indices.astype(np.int32)
+
+
+def mesh_from_prim(prim):
+    """Returns a :class:`compas.datastructures.Mesh`
+
+    Parameters
+    ----------
+    prim : ``pxr.UsdGeom.Mesh`` | :class:`pxr.Usd.Prim`
+        The mesh prim.
+
+    Returns
+    -------
+    :class:`compas.datastructures.Mesh`
+
+    Examples
+    --------
+    >>> mesh = Mesh.from_vertices_and_faces([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], [[0, 1, 2, 3]])
+    >>> prim = prim_from_mesh(stage, "/mesh", mesh)
+    >>> mesh_from_prim(prim).to_vertices_and_faces()
+    ([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]], [[0, 1, 2, 3]])
+    """
+    points, face_vertex_counts, face_vertex_indices = mesh_arrays_from_prim(prim)
+    indices = face_vertex_indices.tolist()
+    ends = np.cumsum(face_vertex_counts).tolist()
+    starts = [0] + ends[:-1]
+    faces = [indices[start:end] for start, end in zip(starts, ends)]
+    return Mesh.from_vertices_and_faces(points.tolist(), faces)
+
+
+def mesh_arrays_from_prim(prim):
+    """Returns the points and face data of a mesh prim as NumPy arrays.
+
+    The arrays are read-only views on the ``pxr.Vt`` arrays stored on the prim,
+    no data is copied and no :class:`compas.datastructures.Mesh` is built.
+
+    Parameters
+    ----------
+    prim : ``pxr.UsdGeom.Mesh`` | :class:`pxr.Usd.Prim`
+        The mesh prim.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The points (shape (V, 3)), the face vertex counts (shape (F,))
+        and the face vertex indices.
+
+    Examples
+    --------
+    >>> points = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]])
+    >>> prim = prim_from_mesh_arrays(stage, "/quad", points, [4], [0, 1, 2, 3])
+    >>> points, counts, indices = mesh_arrays_from_prim(prim)
+    >>> points.shape, counts.tolist(), indices.tolist()
+    ((4, 3), [4], [0, 1, 2, 3])
+    """
+    prim = UsdGeom.Mesh(prim)
+    points = prim.GetPointsAttr().Get()
+    face_vertex_counts = prim.GetFaceVertexCountsAttr().Get()
+    face_vertex_indices = prim.GetFaceVertexIndicesAttr().Get()
+    return (
+        _numpy_view(points, np.float32, (-1, 3)),
+        _numpy_view(face_vertex_counts, np.int32, (-1,)),
+        _numpy_view(face_vertex_indices, np.int32, (-1,)),
+    )
+
+
+def _numpy_view(vtarray, dtype, shape):
+    if vtarray is None:
+        return np.empty((0,) + shape[1:], dtype=dtype)
+    return np.asarray(vtarray).reshape(shape)
+
+
 def prim_from_transformation(stage, path, transformation):
     """Returns a ``pxr.UsdGeom.Xform``
 
@@ -127,41 +668,117 @@ def prim_default(stage, path, transformation=None):  # TODO: This is almost iden
     return prim
 
 
-if __name__ == "__main__":
-    from pxr import Usd
+def prim_from_surface(stage, path, surface):
+    """Returns a :class:`UsdGeom.NurbsPatch`
+
+    The control points and weights are reordered in one array operation, since
+    compas grids are indexed ``[u][v]`` while the points of a patch vary fastest in u.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the prim.
+    surface : :class:`compas.geometry.NurbsSurface`
+        The surface.
+
+    Returns
+    -------
+    :class:`UsdGeom.NurbsPatch`
+    """
+    points, weights = _patch_arrays(surface)
+    prim = UsdGeom.NurbsPatch.Define(stage, path)
+    prim.CreateUVertexCountAttr(len(surface.points))
+    prim.CreateVVertexCountAttr(len(surface.points[0]))
+    prim.CreateUOrderAttr(surface.degree_u + 1)
+    prim.CreateVOrderAttr(surface.degree_v + 1)
+    prim.CreateUKnotsAttr(Vt.DoubleArray(surface.knotvector_u))
+    prim.CreateVKnotsAttr(Vt.DoubleArray(surface.knotvector_v))
+    prim.CreatePointWeightsAttr(vtarray_from_numpy(Vt.DoubleArray, weights, np.float64))
+    prim.CreatePointsAttr(vtarray_from_numpy(Vt.Vec3fArray, points, np.float32))
+    prim.CreateExtentAttr(extent_from_points(points))
+    return prim
 
-    stage = Usd.Stage.CreateInMemory()
-    box = Box(Frame.worldXY(), 1, 1, 1)
-    prim = prim_from_box(stage, "/box", box)
-    print(box_from_prim(prim))
 
+def surface_parameters_from_prim(prim):
+    """Returns the parameters of :meth:`compas.geometry.NurbsSurface.from_parameters` of a NURBS patch prim.
 
-def prim_from_surface(stage, path, surface):
-    """Returns a ``pxr.UsdGeom.NurbsPatch``
+    Unlike :func:`surface_from_prim`, this does not need a NURBS plugin of compas.
+
+    Parameters
+    ----------
+    prim : :class:`UsdGeom.NurbsPatch` | :class:`pxr.Usd.Prim`
+        The NURBS patch prim.
 
-    control_points = [[[0, 0, 0], [0, 4, 0], [0, 8, -3]], [[2, 0, 6], [2, 4, 0], [2, 8, 0]], [[4, 0, 0], [4, 4, 0], [4, 8, 3]], [[6, 0, 0], [6, 4, -3], [6, 8, 0]]]
-    degree = (3, 2)
-    surface = Surface(control_points, degree)
-    prim_from_surface(stage, "/surface", surface)
-    UsdGeom.NurbsPatch(Usd.Prim(</surface>))
+    Returns
+    -------
+    dict
+        The ``points``, ``weights``, ``knots_u``, ``knots_v``, ``mults_u``, ``mults_v``,
+        ``degree_u`` and ``degree_v`` of the surface.
+    """
+    prim = UsdGeom.NurbsPatch(prim)
+    count_u = prim.GetUVertexCountAttr().Get()
+    count_v = prim.GetVVertexCountAttr().Get()
+    points = np.asarray(prim.GetPointsAttr().Get(), dtype=np.float64).reshape(count_v, count_u, 3).transpose(1, 0, 2)
+    weights = prim.GetPointWeightsAttr().Get()
+    if weights:
+        weights = np.asarray(weights, dtype=np.float64).reshape(count_v, count_u).T
+    else:
+        weights = np.ones((count_u, count_v))
+    knots_u, mults_u = np.unique(np.asarray(prim.GetUKnotsAttr().Get()), return_counts=True)
+    knots_v, mults_v = np.unique(np.asarray(prim.GetVKnotsAttr().Get()), return_counts=True)
+    return {
+        "points": points.tolist(),
+        "weights": weights.tolist(),
+        "knots_u": knots_u.tolist(),
+        "knots_v": knots_v.tolist(),
+        "mults_u": mults_u.tolist(),
+        "mults_v": mults_v.tolist(),
+        "degree_u": prim.GetUOrderAttr().Get() - 1,
+        "degree_v": prim.GetVOrderAttr().Get() - 1,
+    }
+
+
+def surface_from_prim(prim):
+    """Returns a :class:`compas.geometry.NurbsSurface` from a NURBS patch prim.
+
+    Parameters
+    ----------
+    prim : :class:`UsdGeom.NurbsPatch` | :class:`pxr.Usd.Prim`
+        The NURBS patch prim.
+
+    Returns
+    -------
+    :class:`compas.geometry.NurbsSurface`
+
+    Raises
+    ------
+    :class:`compas.plugins.PluginNotInstalledError`
+        If no NURBS plugin of compas is installed, e.g. ``compas_occ``.
+        Use :func:`surface_parameters_from_prim` to read the surface without one.
     """
-    degree_u, degree_v = surface.degree
-    knot_vector_u, knot_vector_v = surface.knot_vector
-    count_u, count_v = surface.count
+    parameters = surface_parameters_from_prim(prim)
+    try:
+        return NurbsSurface.from_parameters(**parameters)
+    except PluginNotInstalledError:
+        raise PluginNotInstalledError(
+            "Reading the NURBS patch {} needs a NURBS plugin of compas, such as compas_occ. "
+            "Use surface_parameters_from_prim to read its parameters without one.".format(UsdGeom.NurbsPatch(prim).GetPath())
+        )
 
-    # upside down
-    weights = list(flatten(surface.weights))
-    weights = list(flatten(transpose_matrix(unflatten(weights, count_v))))
-    points = list(flatten(surface.control_points))
-    points = list(flatten(transpose_matrix(unflatten(points, count_v))))
 
-    prim = UsdGeom.NurbsPatch.Define(stage, path)
-    prim.CreateUVertexCountAttr(count_u)
-    prim.CreateVVertexCountAttr(count_v)
-    prim.CreateUOrderAttr(degree_u + 1)
-    prim.CreateVOrderAttr(degree_v + 1)
-    prim.CreateUKnotsAttr(knot_vector_u)
-    prim.CreateVKnotsAttr(knot_vector_v)
-    prim.CreatePointWeightsAttr(weights)
-    prim.CreatePointsAttr(points)
-    return prim
+def _patch_arrays(surface):
+    # compas grids are indexed [u][v], the points of a patch vary fastest in u
+    points = np.asarray(surface.points, dtype=np.float64).transpose(1, 0, 2).reshape(-1, 3)
+    weights = np.asarray(surface.weights, dtype=np.float64).T.reshape(-1)
+    return points, weights
+
+
+if __name__ == "__main__":
+    from pxr import Usd
+
+    stage = Usd.Stage.CreateInMemory()
+    box = Box(Frame.worldXY(), 1, 1, 1)
+    prim = prim_from_box(stage, "/box", box)
+    print(box_from_prim(prim))
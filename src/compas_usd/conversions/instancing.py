@@ -0,0 +1,56 @@
+import numpy as np
+from pxr import Usd
+from pxr import UsdGeom
+from pxr import Vt
+
+from .arrays import vtarray_from_numpy
+from .scene import prim_from_geometry
+from .transformations import decompose_matrices
+from .transformations import matrices_from_transformations
+
+
+def prim_from_point_instances(stage, path, prototype, transformations):
+    """Returns a ``pxr.UsdGeom.PointInstancer`` placing one geometry many times.
+
+    The prototype geometry is written once below the instancer, and the positions,
+    orientations and scales of all instances are written as three arrays. Reflections
+    are written as negative scales. The extent of all instances is authored on the instancer.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the instancer prim.
+    prototype : :class:`compas.geometry.Box` | :class:`compas.geometry.Sphere` | :class:`compas.datastructures.Mesh`
+        The geometry to instance.
+    transformations : list[:class:`compas.geometry.Transformation`] | list[:class:`compas.geometry.Frame`] | array-like
+        The placement of each instance, or an array of matrices of shape (N, 4, 4).
+        Shear components are ignored.
+
+    Returns
+    -------
+    ``pxr.UsdGeom.PointInstancer``
+
+    Examples
+    --------
+    >>> frames = [Frame((i, 0, 0), (1, 0, 0), (0, 1, 0)) for i in range(10)]
+    >>> instancer = prim_from_point_instances(stage, "/bricks", Box(0.2, 0.1, 0.05), frames)
+    >>> len(instancer.GetPositionsAttr().Get())
+    10
+    """
+    matrices = matrices_from_transformations(transformations)
+    translations, quaternions, scales = decompose_matrices(matrices)
+
+    instancer = UsdGeom.PointInstancer.Define(stage, path)
+    prototype_prim = prim_from_geometry(stage, f"{path}/Prototypes/prototype", prototype)
+    instancer.CreatePrototypesRel().SetTargets([prototype_prim.GetPath()])
+
+    instancer.CreateProtoIndicesAttr(vtarray_from_numpy(Vt.IntArray, np.zeros(len(matrices)), np.int32))
+    instancer.CreatePositionsAttr(vtarray_from_numpy(Vt.Vec3fArray, translations, np.float32))
+    # Gf.Quath is stored as (i, j, k, real)
+    instancer.CreateOrientationsAttr(vtarray_from_numpy(Vt.QuathArray, np.roll(quaternions, -1, axis=1), np.float16))
+    if not np.allclose(scales, 1.0):
+        instancer.CreateScalesAttr(vtarray_from_numpy(Vt.Vec3fArray, scales, np.float32))
+    instancer.CreateExtentAttr(instancer.ComputeExtentAtTime(Usd.TimeCode.Default(), Usd.TimeCode.Default()))
+    return instancer
@@ -0,0 +1,109 @@
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .geometry import arrays_from_mesh
+
+_POOL = ContextVar("compas_usd_mesh_arrays_pool", default=None)
+
+# the meshes of the running export, forked workers read them by index
+_MESHES = []
+
+# meshes with fewer faces are prepared on the calling thread, the round trip to a worker costs more
+MIN_POOL_FACES = 1000
+
+
+def _mesh_arrays_at(index):
+    return arrays_from_mesh(_MESHES[index])
+
+
+class MeshArraysPool(object):
+    """Prepares the arrays of :func:`arrays_from_mesh` for many meshes in forked worker processes.
+
+    The workers are forked when the pool is created, so they inherit the meshes from the
+    memory of the calling process and only the finished numpy buffers are sent back.
+    The arrays are returned in the order of the meshes, and at most ``window`` meshes
+    are prepared ahead of the caller, so streaming exports keep their memory bound.
+
+    Parameters
+    ----------
+    meshes : list[:class:`compas.datastructures.Mesh`]
+        The meshes, in the order in which their arrays are requested.
+    processes : int
+        The number of worker processes.
+    window : int, optional
+        The number of meshes prepared ahead. Defaults to four per process.
+
+    Notes
+    -----
+    Only one pool can be open at a time. The workers only run :func:`arrays_from_mesh`,
+    so they never call into USD from the forked copy of a process that may run USD threads.
+    """
+
+    def __init__(self, meshes, processes, window=None):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Preparing mesh arrays in worker processes needs the fork start method, which this platform does not support.")
+        if _MESHES:
+            raise RuntimeError("Another mesh arrays pool is open.")
+        self.indices = {id(mesh): index for index, mesh in enumerate(meshes)}
+        self.window = window or 4 * processes
+        _MESHES[:] = meshes
+        self._pool = multiprocessing.get_context("fork").Pool(processes)
+        self._pending = deque()
+        self._submitted = 0
+        self._done = 0
+        self._submit()
+
+    def _submit(self):
+        while self._submitted < len(_MESHES) and len(self._pending) < self.window:
+            self._pending.append(self._pool.apply_async(_mesh_arrays_at, (self._submitted,)))
+            self._submitted += 1
+
+    def get(self, mesh):
+        """Returns the arrays of a mesh, or None if the mesh is not prepared by the pool.
+
+        Meshes before ``mesh`` that were not requested are skipped, e.g. the duplicates of an instanced prototype.
+        """
+        index = self.indices.get(id(mesh))
+        if index is None or index < self._done:
+            return None
+        while self._done <= index:
+            arrays = self._pending.popleft().get()
+            self._done += 1
+            self._submit()
+        return arrays
+
+    def close(self):
+        """Stops the worker processes."""
+        self._pool.terminate()
+        self._pool.join()
+        del _MESHES[:]
+
+
+@contextmanager
+def mesh_arrays_pool(meshes, processes):
+    """Prepares the arrays of the meshes in a :class:`MeshArraysPool` for the exports in the block.
+
+    Meshes with fewer than :data:`MIN_POOL_FACES` faces are left to the calling thread.
+    If ``processes`` is None or there are no such meshes, no pool is created.
+    """
+    meshes = [mesh for mesh in meshes if mesh.number_of_faces() >= MIN_POOL_FACES] if processes else []
+    if not meshes:
+        yield None
+        return
+    pool = MeshArraysPool(meshes, processes)
+    token = _POOL.set(pool)
+    try:
+        yield pool
+    finally:
+        _POOL.reset(token)
+        pool.close()
+
+
+def prepared_mesh_arrays(mesh):
+    """Returns the arrays of a mesh prepared by the active pool, or None."""
+    pool = _POOL.get()
+    if pool is None:
+        return None
+    return pool.get(mesh)
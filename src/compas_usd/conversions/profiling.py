@@ -0,0 +1,145 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_PROFILER = ContextVar("compas_usd_profiler", default=None)
+
+
+class ExportProfile(object):
+    """Counters and timings of a scene export.
+
+    Pass an instance as ``profiler`` to :func:`stage_from_scene`. Without a profiler,
+    the exporter only checks for an active profiler once per item.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the profile when the export is finished, e.g. to send the
+        numbers to a metrics service.
+
+    Attributes
+    ----------
+    phases : dict[str, dict[str, float]]
+        The ``calls`` and ``seconds`` of each phase, e.g. ``"author"`` or ``"save"``.
+    converters : dict[str, dict[str, float]]
+        The ``prims`` written, array ``elements`` written and ``seconds`` spent by
+        item type. Transform authoring is counted as ``"Transformation"``.
+    bytes_saved : int
+        The size of the files written.
+
+    Examples
+    --------
+    >>> profile = ExportProfile()
+    >>> with profile.phase("author"):
+    ...     pass
+    >>> profile.phases["author"]["calls"]
+    1
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.phases = {}
+        self.converters = {}
+        self.bytes_saved = 0
+
+    @contextmanager
+    def phase(self, name):
+        """Times a phase of the export."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            counters = self.phases.setdefault(name, {"calls": 0, "seconds": 0.0})
+            counters["calls"] += 1
+            counters["seconds"] += time.perf_counter() - start
+
+    def measure(self, name, converter, *args):
+        """Calls a converter and counts its prims, array elements and time under ``name``."""
+        start = time.perf_counter()
+        result = converter(*args)
+        seconds = time.perf_counter() - start
+        counters = self.converters.setdefault(name, {"prims": 0, "elements": 0, "seconds": 0.0})
+        counters["prims"] += 1
+        counters["elements"] += _array_elements(result)
+        counters["seconds"] += seconds
+        return result
+
+    def add_file(self, file_path):
+        """Counts the size of a written file."""
+        if os.path.isfile(file_path):
+            self.bytes_saved += os.path.getsize(file_path)
+
+    def finish(self):
+        """Calls the callback, once the export is finished."""
+        if self.callback is not None:
+            self.callback(self)
+
+    def as_dict(self):
+        """Returns the counters as a dictionary."""
+        return {"phases": self.phases, "converters": self.converters, "bytes_saved": self.bytes_saved}
+
+    def report(self):
+        """Returns the counters as a text table."""
+        lines = ["{:<24} {:>8} {:>12}".format("phase", "calls", "seconds")]
+        for name, counters in self.phases.items():
+            lines.append("{:<24} {:>8} {:>12.4f}".format(name, counters["calls"], counters["seconds"]))
+        lines.append("")
+        lines.append("{:<24} {:>8} {:>12} {:>12}".format("converter", "prims", "elements", "seconds"))
+        for name, counters in sorted(self.converters.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append("{:<24} {:>8} {:>12} {:>12.4f}".format(name, counters["prims"], counters["elements"], counters["seconds"]))
+        lines.append("")
+        lines.append("bytes saved: {}".format(self.bytes_saved))
+        return "\n".join(lines)
+
+
+def active_profiler():
+    """Returns the profiler of the current export, or None."""
+    return _PROFILER.get()
+
+
+@contextmanager
+def profiling(profiler):
+    """Activates a profiler for the exports in the block, and finishes it at the end.
+
+    If ``profiler`` is None, a profiler that is already active stays active.
+    """
+    if profiler is None:
+        yield _PROFILER.get()
+        return
+    token = _PROFILER.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _PROFILER.reset(token)
+        profiler.finish()
+
+
+@contextmanager
+def phase(name):
+    """Times a phase with the active profiler, if any."""
+    profiler = _PROFILER.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+def measure(name, converter, *args):
+    """Calls a converter, measured by the active profiler, if any."""
+    profiler = _PROFILER.get()
+    if profiler is None:
+        return converter(*args)
+    return profiler.measure(name, converter, *args)
+
+
+def _array_elements(result):
+    # the number of array values written on a prim or prim spec
+    if result is None:
+        return 0
+    if hasattr(result, "attributes"):
+        values = (attribute.default for attribute in result.attributes)
+    else:
+        values = (attribute.Get() for attribute in result.GetPrim().GetAttributes())
+    return sum(len(value) for value in values if type(value).__module__ == "pxr.Vt")
@@ -0,0 +1,41 @@
+class ConverterRegistry(object):
+    """Conversion functions by item type.
+
+    A lookup walks the MRO of the type of the item, so converters registered for a
+    base class also apply to its subclasses. The result is cached per type, so each
+    further lookup is a single dictionary access.
+
+    Examples
+    --------
+    >>> from compas.geometry import Shape
+    >>> registry = ConverterRegistry()
+    >>> registry.register(Shape, "shape converter")
+    >>> registry.lookup(Box)
+    'shape converter'
+    >>> registry.lookup(Mesh) is None
+    True
+    """
+
+    def __init__(self):
+        self.converters = {}
+        self._cache = {}
+
+    def register(self, item_type, converter):
+        """Registers the converter of an item type, replacing any previous one."""
+        self.converters[item_type] = converter
+        self._cache.clear()
+
+    def unregister(self, item_type):
+        """Removes the converter registered for exactly this item type, if any."""
+        self.converters.pop(item_type, None)
+        self._cache.clear()
+
+    def lookup(self, item_type):
+        """Returns the converter of the closest registered base of a type, or None."""
+        try:
+            return self._cache[item_type]
+        except KeyError:
+            pass
+        converter = next((self.converters[base] for base in item_type.__mro__ if base in self.converters), None)
+        self._cache[item_type] = converter
+        return converter
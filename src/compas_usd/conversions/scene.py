@@ -1,19 +1,170 @@
+import hashlib
+import os
+import tempfile
+from itertools import chain
+
+import compas
 from compas.scene import Scene
 from compas.scene import SceneObject
+from compas.scene import Group
 from compas.data import Data
 from compas.geometry import Box
+from compas.geometry import Capsule
+from compas.geometry import Cone
+from compas.geometry import Cylinder
+from compas.geometry import NurbsSurface
 from compas.geometry import Sphere
+from compas.geometry import Torus
 from compas.geometry import Transformation
 from compas.datastructures import Mesh
 from compas_usd.conversions import prim_from_transformation
+from compas_usd.conversions import transformation_from_gfmatrix4d
+from compas_usd.conversions import gfmatrix4d_from_transformation
+from compas_usd.conversions import box_from_prim
+from compas_usd.conversions import sphere_from_prim
+from compas_usd.conversions import cylinder_from_prim
+from compas_usd.conversions import mesh_from_prim
+from compas_usd.conversions import cone_from_prim
+from compas_usd.conversions import capsule_from_prim
+from compas_usd.conversions import torus_from_prim
+from compas_usd.conversions import surface_from_prim
 from compas_usd.conversions import prim_from_box
 from compas_usd.conversions import prim_from_sphere
+from compas_usd.conversions import prim_from_cylinder
+from compas_usd.conversions import prim_from_cone
+from compas_usd.conversions import prim_from_capsule
+from compas_usd.conversions import prim_from_torus
+from compas_usd.conversions import prim_from_surface
 from compas_usd.conversions import prim_from_mesh
+from compas_usd.conversions import prim_from_mesh_arrays
+from compas_usd.conversions import prim_from_mesh_arrays_lods
+from compas_usd.conversions import arrays_from_mesh
+from compas_usd.conversions.geometry import TORUS_KEY
+from compas_usd.conversions.parallel import mesh_arrays_pool
+from compas_usd.conversions.parallel import prepared_mesh_arrays
+from compas_usd.conversions.profiling import ExportProfile
+from compas_usd.conversions.profiling import active_profiler
+from compas_usd.conversions.profiling import measure
+from compas_usd.conversions.profiling import phase
+from compas_usd.conversions.profiling import profiling
+from compas_usd.conversions.registry import ConverterRegistry
+from compas_usd.conversions.specs import spec_define
+from compas_usd.material import USDMaterial
+from compas_usd.material import material_hash
+from compas_usd.conversions.specs import spec_from_box
+from compas_usd.conversions.specs import spec_from_sphere
+from compas_usd.conversions.specs import spec_from_cylinder
+from compas_usd.conversions.specs import spec_from_cone
+from compas_usd.conversions.specs import spec_from_capsule
+from compas_usd.conversions.specs import spec_from_torus
+from compas_usd.conversions.specs import spec_from_surface
+from compas_usd.conversions.specs import spec_from_mesh
+from compas_usd.conversions.specs import spec_from_mesh_arrays
+from compas_usd.conversions.specs import spec_from_transformation
+
+from pxr import Sdf, Usd, UsdGeom, UsdShade, UsdUtils
+
+
+def _mesh_or_torus_from_prim(prim):
+    # a torus is written as a mesh that keeps its radii in the custom data
+    if prim.GetCustomDataByKey(TORUS_KEY):
+        return torus_from_prim(prim)
+    return mesh_from_prim(prim)
+
 
-from pxr import Usd, UsdGeom
+PROTOTYPES_PATH = "/Prototypes"
+FINGERPRINT_KEY = "compas:fingerprint"
+FILE_FORMATS = {".usda": "usda", ".usdc": "usdc", ".usdz": "usdz"}
+ITEM_READERS = {
+    "Cube": box_from_prim,
+    "Sphere": sphere_from_prim,
+    "Cylinder": cylinder_from_prim,
+    "Cone": cone_from_prim,
+    "Capsule": capsule_from_prim,
+    "Mesh": _mesh_or_torus_from_prim,
+    "NurbsPatch": surface_from_prim,
+}
 
 
-def stage_from_scene(scene: Scene, file_path: str) -> Usd.Stage:
+PRIM_CONVERTERS = ConverterRegistry()
+SPEC_CONVERTERS = ConverterRegistry()
+
+
+def register_converter(item_type: type, prim_converter, spec_converter=None) -> None:
+    """
+    Registers the functions that convert items of a type, and of its subclasses, to prims.
+
+    Converters registered for a type replace the built-in ones, e.g. to write a
+    :class:`compas.geometry.Box` as a mesh. Items without a converter are tessellated
+    if they have a ``to_vertices_and_faces`` method.
+
+    Parameters
+    ----------
+    item_type : type
+        The type of the items.
+    prim_converter : callable
+        The function ``prim_converter(stage, path, item)`` that returns the prim of an item.
+    spec_converter : callable, optional
+        The function ``spec_converter(layer, path, item)`` that returns the prim spec of
+        an item, for ``backend="sdf"``. If omitted, such items are tessellated by the sdf backend.
+
+    Examples
+    --------
+    >>> def prim_from_line(stage, path, line):
+    ...     curves = UsdGeom.BasisCurves.Define(stage, path)
+    ...     curves.CreateTypeAttr(UsdGeom.Tokens.linear)
+    ...     curves.CreateCurveVertexCountsAttr([2])
+    ...     curves.CreatePointsAttr([tuple(line.start), tuple(line.end)])
+    ...     return curves
+    >>> from compas.geometry import Line
+    >>> register_converter(Line, prim_from_line)
+    >>> unregister_converter(Line)
+    """
+    PRIM_CONVERTERS.register(item_type, prim_converter)
+    if spec_converter is not None:
+        SPEC_CONVERTERS.register(item_type, spec_converter)
+
+
+def unregister_converter(item_type: type) -> None:
+    """
+    Removes the converters registered for a type with :func:`register_converter`.
+
+    Items of the type are then converted by the converters of its closest registered base.
+
+    Parameters
+    ----------
+    item_type : type
+        The type of the items.
+    """
+    PRIM_CONVERTERS.unregister(item_type)
+    SPEC_CONVERTERS.unregister(item_type)
+
+
+for item_type, prim_converter, spec_converter in [
+    (Box, prim_from_box, spec_from_box),
+    (Sphere, prim_from_sphere, spec_from_sphere),
+    (Cylinder, prim_from_cylinder, spec_from_cylinder),
+    (Cone, prim_from_cone, spec_from_cone),
+    (Capsule, prim_from_capsule, spec_from_capsule),
+    (Torus, prim_from_torus, spec_from_torus),
+    (Mesh, prim_from_mesh, spec_from_mesh),
+    (NurbsSurface, prim_from_surface, spec_from_surface),
+]:
+    register_converter(item_type, prim_converter, spec_converter)
+
+
+def stage_from_scene(
+    scene: Scene,
+    file_path: str,
+    streaming: bool = False,
+    instancing: bool = False,
+    backend: str = "usd",
+    file_format: str = None,
+    incremental: bool = False,
+    profiler: ExportProfile = None,
+    lods: dict = None,
+    processes: int = None,
+) -> Usd.Stage:
     """
     Converts a :class:`compas.scene.Scene` to a USD stage.
 
@@ -23,22 +174,518 @@ def stage_from_scene(scene: Scene, file_path: str) -> Usd.Stage:
         The scene to convert.
     file_path : str
         The file path to the USD stage.
+    streaming : bool, optional
+        If True, every top-level scene object is written to its own payload file
+        as soon as it is converted, and released from memory before the next one
+        is converted. The root layer at ``file_path`` only references the payloads.
+        See :func:`stage_from_scene_streaming`.
+    instancing : bool, optional
+        If True, items with identical geometry are written once as a prototype
+        and referenced from instanceable prims. See :func:`prim_from_item`.
+    backend : {"usd", "sdf"}, optional
+        ``"usd"`` authors prims through the ``UsdGeom`` schemas.
+        ``"sdf"`` authors the same specs directly on the root layer inside one
+        ``Sdf.ChangeBlock``, which is much faster for scenes with many small prims.
+    file_format : {"usda", "usdc", "usdz"}, optional
+        The output format. Defaults to the format implied by the extension of ``file_path``.
+        ``"usda"`` and ``"usdc"`` can also be written to a ``.usd`` file. Binary crate files
+        (``"usdc"``) are much smaller and faster to write and load than ASCII files for large
+        scenes, and compress integer arrays such as face indices.
+        ``"usdz"`` writes a crate stage to a temporary folder and packages it, together with
+        its payloads and referenced assets such as textures and MDL files, into ``file_path``.
+    incremental : bool, optional
+        If True and ``file_path`` exists, only the prims of scene objects that changed since
+        the last incremental export are re-authored, and prims of deleted scene objects are
+        removed. See :func:`stage_from_scene_incremental`.
+    profiler : :class:`ExportProfile`, optional
+        If given, counts the prims and array elements written and the time spent per
+        item type, times the authoring, material binding and saving phases, and sums
+        the size of the written files.
+    lods : dict[str, int | None], optional
+        If given, every mesh item is written with a ``lod`` variant set of decimated
+        versions by variant name, e.g. :data:`MESH_LODS`, see :func:`prim_from_mesh_arrays_lods`.
+        Only supported by the usd backend.
+    processes : int, optional
+        If given, the arrays of the mesh items with at least
+        :data:`~compas_usd.conversions.parallel.MIN_POOL_FACES` faces are prepared with
+        :func:`arrays_from_mesh` in this many worker processes, while the stage is authored
+        on the calling thread in scene order. The workers are forked and read the
+        meshes from the memory of the calling process, so only the finished arrays are copied.
+        Not supported on platforms without the ``fork`` start method, or by incremental exports.
 
     Returns
     -------
     :class:`pxr.Usd.Stage`
         The USD stage.
+
+    Notes
+    -----
+    Scene objects with a ``material`` or a ``color`` are bound to a shared preview surface
+    material under ``/Looks``, see :func:`bind_materials`.
+    """
+    with profiling(profiler):
+        if incremental and processes:
+            raise ValueError("Incremental export does not support processes.")
+        with mesh_arrays_pool(_pool_meshes(scene.root.children, backend), processes):
+            return _stage_from_scene(scene, file_path, streaming, instancing, backend, file_format, incremental, lods)
+
+
+def _pool_meshes(sceneobjects, backend):
+    # the mesh items written by the built-in mesh converter of the backend, in authoring order
+    converters, converter = (SPEC_CONVERTERS, spec_from_mesh) if backend == "sdf" else (PRIM_CONVERTERS, prim_from_mesh)
+    seen = set()
+    for _, sceneobject in _sceneobjects_by_path(sceneobjects, ""):
+        item = sceneobject.item
+        if isinstance(item, Mesh) and id(item) not in seen and converters.lookup(type(item)) is converter:
+            seen.add(id(item))
+            yield item
+
+
+def _stage_from_scene(scene, file_path, streaming, instancing, backend, file_format, incremental, lods):
+    file_format = _resolve_file_format(file_path, file_format)
+    if incremental:
+        if streaming or instancing or backend != "usd" or file_format == "usdz" or lods:
+            raise ValueError("Incremental export does not support streaming, instancing, the sdf backend, usdz output or lods.")
+        return stage_from_scene_incremental(scene, file_path, file_format=file_format)
+    if file_format == "usdz":
+        return _stage_from_scene_usdz(scene, file_path, streaming=streaming, instancing=instancing, backend=backend, lods=lods)
+    if streaming:
+        return stage_from_scene_streaming(scene, file_path, instancing=instancing, backend=backend, file_format=file_format, lods=lods)
+    _check_backend(backend, lods)
+
+    stage = _create_new_stage(file_path, file_format)
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    prototypes = {} if instancing else None
+    _author_sceneobjects(stage, scene.root.children, [scene.name], prototypes, backend, lods)
+    bind_materials(stage, scene.root.children, [scene.name])
+
+    _save(stage)
+    return stage
+
+
+def stage_from_scene_streaming(
+    scene: Scene,
+    file_path: str,
+    instancing: bool = False,
+    backend: str = "usd",
+    file_format: str = None,
+    lods: dict = None,
+) -> Usd.Stage:
+    """
+    Converts a :class:`compas.scene.Scene` to a USD stage, one payload file per top-level scene object.
+
+    The payloads are written to a folder next to ``file_path`` named after the stage,
+    e.g. ``scene.usda`` references ``scene/Boxes.usda``. Each payload stage is saved
+    and dropped before the next scene object is converted, so peak memory is bounded
+    by the largest top-level group instead of the whole scene.
+
+    Parameters
+    ----------
+    scene : :class:`compas.scene.Scene`
+        The scene to convert.
+    file_path : str
+        The file path to the root USD stage.
+    instancing : bool, optional
+        If True, items with identical geometry are instanced within each payload file.
+    backend : {"usd", "sdf"}, optional
+        The authoring backend of the payload files, see :func:`stage_from_scene`.
+    file_format : {"usda", "usdc"}, optional
+        The format of the root and payload files, see :func:`stage_from_scene`.
+    lods : dict[str, int | None], optional
+        The level of detail variants of mesh items, see :func:`stage_from_scene`.
+
+    Returns
+    -------
+    :class:`pxr.Usd.Stage`
+        The root USD stage, opened with its payloads unloaded.
+        Call ``stage.Load()`` to compose the full scene.
     """
-    stage = Usd.Stage.CreateNew(file_path)
+    _check_backend(backend, lods)
+    file_format = _resolve_file_format(file_path, file_format)
+    if file_format == "usdz":
+        raise ValueError("Streaming payloads cannot be written into a usdz package directly, use stage_from_scene.")
+    root, ext = os.path.splitext(file_path)
+    folder = os.path.basename(root)
+
+    stage = _create_new_stage(file_path, file_format, load=Usd.Stage.LoadNone)
     UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    stage.DefinePrim("/" + scene.name)
+
+    for obj in scene.root.children:
+        payload_path = os.path.join(root, obj.name + ext)
+        _write_payload(obj, payload_path, instancing, backend, file_format, lods)
+        prim = stage.DefinePrim("/" + "/".join([scene.name, obj.name]))
+        prim.GetPayloads().AddPayload("./" + "/".join([folder, obj.name + ext]))
+
+    _save(stage)
+    return stage
+
+
+def stage_from_scene_incremental(scene: Scene, file_path: str, file_format: str = None) -> Usd.Stage:
+    """
+    Updates an existing USD stage to match a :class:`compas.scene.Scene`.
+
+    Every scene object prim stores a fingerprint of the transformation, the item and
+    the material of its scene object in its ``customData``. Prims whose fingerprint did
+    not change are left untouched, so the time of an update scales with the number of
+    changed scene objects rather than the size of the scene. Prims of scene objects that
+    no longer exist are removed, while prims outside of the scene root prim are kept.
+    The material bindings below the scene root prim are then authored again with
+    :func:`bind_materials`, reusing the materials already defined under ``/Looks``.
+    If ``file_path`` does not exist, the stage is created.
+
+    Parameters
+    ----------
+    scene : :class:`compas.scene.Scene`
+        The scene to convert.
+    file_path : str
+        The file path to the USD stage.
+    file_format : {"usda", "usdc"}, optional
+        The format of a new stage, see :func:`stage_from_scene`.
+
+    Returns
+    -------
+    :class:`pxr.Usd.Stage`
+        The USD stage.
+    """
+    file_format = _resolve_file_format(file_path, file_format)
+    if os.path.exists(file_path):
+        stage = Usd.Stage.Open(file_path)
+    else:
+        stage = _create_new_stage(file_path, file_format)
+        UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+
+    names = set()
     for obj in scene.root.children:
-        prim_from_sceneobject(stage, obj, parent_path=[scene.name])
+        _sync_sceneobject(stage, obj, [scene.name])
+        names.add(obj.name)
+    _remove_prims_except(stage, "/" + scene.name, names)
+    _clear_material_bindings(stage, "/" + scene.name)
+    bind_materials(stage, scene.root.children, [scene.name])
 
-    stage.Save()
+    _save(stage)
     return stage
 
 
-def prim_from_sceneobject(stage: Usd.Stage, sceneobject: SceneObject, parent_path=[]) -> Usd.Prim:
+def stage_from_scene_states(
+    states,
+    file_path: str,
+    start_time: float = 0.0,
+    time_step: float = 1.0,
+    file_format: str = None,
+) -> Usd.Stage:
+    """
+    Converts a sequence of states of a :class:`compas.scene.Scene` to an animated USD stage.
+
+    The first state is written like :func:`stage_from_scene`, including its material
+    bindings. The transformations of
+    the scene objects in every state are then written as time samples of their
+    ``xformOp:transform``, directly on the root layer and one ``Sdf.ChangeBlock`` per
+    state. States are consumed one at a time, so a generator that updates and yields
+    the same scene keeps only the current state in memory. Scene objects that are not
+    in the first state are ignored, and scene objects without a transformation keep
+    their static default.
+
+    Parameters
+    ----------
+    states : iterable[:class:`compas.scene.Scene`]
+        The scene of every frame.
+    file_path : str
+        The file path to the USD stage.
+    start_time : float, optional
+        The time code of the first frame.
+    time_step : float, optional
+        The time code increment per frame.
+    file_format : {"usda", "usdc"}, optional
+        The output format, see :func:`stage_from_scene`.
+
+    Returns
+    -------
+    :class:`pxr.Usd.Stage`
+        The USD stage, with its start and end time codes set to the first and last frame.
+    """
+    file_format = _resolve_file_format(file_path, file_format)
+    if file_format == "usdz":
+        raise ValueError("Animated stages cannot be written into a usdz package directly, use a usdc file.")
+    states = iter(states)
+    scene = next(states, None)
+    if scene is None:
+        raise ValueError("At least one scene state is required.")
+    root = scene.name
+
+    stage = _create_new_stage(file_path, file_format)
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    _author_sceneobjects(stage, scene.root.children, [root], None, "usd")
+    bind_materials(stage, scene.root.children, [root])
+
+    layer = stage.GetRootLayer()
+    time = float(start_time)
+    for index, scene in enumerate(chain([scene], states)):
+        if index:
+            time += time_step
+        with phase("time_samples"), Sdf.ChangeBlock():
+            for path, sceneobject in _sceneobjects_by_path(scene.root.children, "/" + root):
+                if sceneobject.transformation is None:
+                    continue
+                attribute = layer.GetAttributeAtPath(path + ".xformOp:transform")
+                if attribute:
+                    layer.SetTimeSample(attribute.path, time, gfmatrix4d_from_transformation(sceneobject.transformation))
+
+    stage.SetStartTimeCode(start_time)
+    stage.SetEndTimeCode(time)
+    _save(stage)
+    return stage
+
+
+def _sceneobjects_by_path(sceneobjects, parent_path):
+    for sceneobject in sceneobjects:
+        path = parent_path + "/" + sceneobject.name
+        yield path, sceneobject
+        yield from _sceneobjects_by_path(sceneobject.children, path)
+
+
+def sceneobject_fingerprint(sceneobject: SceneObject) -> str:
+    """
+    Computes a hash of the transformation, the item and the material of a scene object, ignoring its children.
+
+    The material is the ``material`` attribute of the scene object, or else its ``color``,
+    like in :func:`bind_materials`.
+
+    Parameters
+    ----------
+    sceneobject : :class:`compas.scene.SceneObject`
+        The scene object.
+
+    Returns
+    -------
+    str
+        The hexadecimal sha256 digest.
+    """
+    h = hashlib.sha256()
+    if sceneobject.transformation is not None:
+        h.update(compas.json_dumps(sceneobject.transformation.matrix).encode())
+    item = sceneobject.item
+    if item is not None:
+        h.update(item.name.encode())
+        h.update(geometry_hash(item).encode())
+    material = getattr(sceneobject, "material", None)
+    if material is None:
+        material = sceneobject.color
+    if material is not None:
+        h.update(material_hash(material).encode())
+    return h.hexdigest()
+
+
+def _sync_sceneobject(stage, sceneobject, parent_path):
+    path = parent_path + [sceneobject.name]
+    prim_path = "/" + "/".join(path)
+    prim = stage.GetPrimAtPath(prim_path)
+    fingerprint = sceneobject_fingerprint(sceneobject)
+
+    if not prim or prim.GetCustomDataByKey(FINGERPRINT_KEY) != fingerprint:
+        if prim:
+            UsdGeom.Xformable(prim).ClearXformOpOrder()
+        transformation = sceneobject.transformation if sceneobject.transformation is not None else Transformation()
+        prim = prim_from_transformation(stage, prim_path, transformation).GetPrim()
+        if sceneobject.item is not None:
+            # a new item may have a different prim type, start from a clean prim
+            stage.RemovePrim(prim_path + "/" + sceneobject.item.name)
+            prim_from_item(stage, sceneobject.item, parent_path=path)
+        prim.SetCustomDataByKey(FINGERPRINT_KEY, fingerprint)
+
+    names = set()
+    if sceneobject.item is not None:
+        names.add(sceneobject.item.name)
+    for child in sceneobject.children:
+        _sync_sceneobject(stage, child, path)
+        names.add(child.name)
+    _remove_prims_except(stage, prim_path, names)
+
+
+def _remove_prims_except(stage, path, names):
+    prim = stage.GetPrimAtPath(path)
+    if not prim:
+        return
+    for child in prim.GetAllChildren():
+        if child.GetName() not in names:
+            stage.RemovePrim(child.GetPath())
+
+
+def _clear_material_bindings(stage, path):
+    # removes the direct and collection-based bindings authored by bind_materials
+    root = stage.GetPrimAtPath(path)
+    if not root:
+        return
+    for prim in Usd.PrimRange(root):
+        if not prim.HasAPI(UsdShade.MaterialBindingAPI):
+            continue
+        schemas = {"MaterialBindingAPI"}
+        for binding in UsdShade.MaterialBindingAPI(prim).GetCollectionBindings():
+            name = binding.GetCollectionPath().name.split(":", 1)[1]
+            schemas.add("CollectionAPI:" + name)
+            prim.RemoveProperty("collection:{}:includes".format(name))
+        for name in prim.GetAuthoredPropertyNames():
+            if name.startswith("material:binding"):
+                prim.RemoveProperty(name)
+        api_schemas = prim.GetMetadata("apiSchemas")
+        api_schemas.prependedItems = [schema for schema in api_schemas.prependedItems if schema not in schemas]
+        if api_schemas.prependedItems:
+            prim.SetMetadata("apiSchemas", api_schemas)
+        else:
+            prim.ClearMetadata("apiSchemas")
+
+
+def _write_payload(sceneobject: SceneObject, file_path: str, instancing: bool, backend="usd", file_format=None, lods=None) -> None:
+    stage = _create_new_stage(file_path, file_format)
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    prototypes = {} if instancing else None
+    _author_sceneobjects(stage, [sceneobject], [], prototypes, backend, lods)
+    bind_materials(stage, [sceneobject], [])
+    stage.SetDefaultPrim(stage.GetPrimAtPath("/" + sceneobject.name))
+    _save(stage)
+
+
+def _save(stage):
+    with phase("save"):
+        stage.Save()
+    profiler = active_profiler()
+    if profiler is not None:
+        profiler.add_file(stage.GetRootLayer().realPath)
+
+
+def _stage_from_scene_usdz(scene: Scene, file_path: str, **kwargs) -> Usd.Stage:
+    with tempfile.TemporaryDirectory() as folder:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        asset_path = os.path.join(folder, name + ".usdc")
+        stage = stage_from_scene(scene, asset_path, **kwargs)
+        # release the stage before its files are packaged and deleted
+        del stage
+        if not UsdUtils.CreateNewUsdzPackage(Sdf.AssetPath(asset_path), file_path):
+            raise RuntimeError("Could not write usdz package: {}".format(file_path))
+    return Usd.Stage.Open(file_path)
+
+
+def _resolve_file_format(file_path, file_format):
+    ext = os.path.splitext(file_path)[1].lower()
+    if file_format is None:
+        return FILE_FORMATS.get(ext)
+    if file_format not in FILE_FORMATS.values():
+        raise ValueError("Unknown file format: {}. Use one of: {}.".format(file_format, ", ".join(FILE_FORMATS.values())))
+    if ext == ".usd" and file_format != "usdz":
+        return file_format
+    if FILE_FORMATS.get(ext) != file_format:
+        raise ValueError("File format {} does not match file path: {}".format(file_format, file_path))
+    return file_format
+
+
+def _create_new_stage(file_path, file_format=None, load=Usd.Stage.LoadAll):
+    # only the generic .usd extension takes the format as an argument
+    args = {"format": file_format} if file_format and os.path.splitext(file_path)[1].lower() == ".usd" else {}
+    layer = Sdf.Layer.CreateNew(file_path, args=args)
+    return Usd.Stage.Open(layer, load=load)
+
+
+def _check_backend(backend, lods=None):
+    if backend not in ("usd", "sdf"):
+        raise ValueError("Unknown backend: {}. Use 'usd' or 'sdf'.".format(backend))
+    if lods and backend != "usd":
+        raise ValueError("Level of detail variants are only written by the usd backend.")
+
+
+@phase("author")
+def _author_sceneobjects(stage, sceneobjects, parent_path, prototypes, backend, lods=None):
+    if backend == "sdf":
+        layer = stage.GetRootLayer()
+        with Sdf.ChangeBlock():
+            if parent_path:
+                spec_define(layer, "/" + "/".join(parent_path))
+            for obj in sceneobjects:
+                spec_from_sceneobject(layer, obj, parent_path=parent_path, prototypes=prototypes)
+    else:
+        for obj in sceneobjects:
+            prim_from_sceneobject(stage, obj, parent_path=parent_path, prototypes=prototypes, lods=lods)
+
+
+@phase("bind_materials")
+def bind_materials(stage: Usd.Stage, sceneobjects, parent_path=[]) -> None:
+    """
+    Binds the materials of scene objects to their prims, with as few bindings as possible.
+
+    The material of a scene object is its ``material`` attribute, converted with
+    :meth:`USDMaterial.from_material`, or else its ``color``, converted with
+    :meth:`USDMaterial.from_color`. Identical materials are defined once.
+    If all items below a scene object share one material, the material is bound
+    once on the prim of that scene object. The remaining prims of each material are
+    bound together with one collection-based binding on their common ancestor.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage with the prims of the scene objects.
+    sceneobjects : list[:class:`compas.scene.SceneObject`]
+        The scene objects.
+    parent_path : list[str], optional
+        The path to the parent prim of the scene objects.
+    """
+    bindings = []
+    for sceneobject in sceneobjects:
+        bindings.extend(_material_bindings(stage, sceneobject, "/".join([""] + parent_path + [sceneobject.name]))[1])
+
+    paths_by_material = {}
+    for path, material in bindings:
+        paths_by_material.setdefault(material, []).append(Sdf.Path(path))
+
+    for material, paths in paths_by_material.items():
+        ancestor = paths[0].GetParentPath()
+        for path in paths[1:]:
+            ancestor = ancestor.GetCommonPrefix(path)
+        if len(paths) == 1 or ancestor == Sdf.Path.absoluteRootPath:
+            for path in paths:
+                material.bind(stage.GetPrimAtPath(path))
+            continue
+        name = material.GetPath().name
+        prim = stage.GetPrimAtPath(ancestor)
+        collection = Usd.CollectionAPI.Apply(prim, name)
+        collection.CreateIncludesRel().SetTargets(paths)
+        UsdShade.MaterialBindingAPI.Apply(prim).Bind(collection, UsdShade.Material(material.material), name)
+
+
+# placeholders for subtrees without items, and for subtrees with different materials
+_NO_ITEMS = object()
+_MIXED = object()
+
+
+def _material_bindings(stage, sceneobject, path):
+    # returns the material shared by all items of the subtree, and its (path, material) bindings
+    shared = _NO_ITEMS
+    bindings = []
+    if sceneobject.item is not None:
+        shared = _sceneobject_material(stage, sceneobject)
+        if shared is not None:
+            bindings.append((path + "/" + sceneobject.item.name, shared))
+
+    for child in sceneobject.children:
+        child_shared, child_bindings = _material_bindings(stage, child, path + "/" + child.name)
+        bindings.extend(child_bindings)
+        if child_shared is _NO_ITEMS:
+            continue
+        shared = child_shared if shared is _NO_ITEMS or shared is child_shared else _MIXED
+
+    if shared is not None and shared is not _NO_ITEMS and shared is not _MIXED:
+        bindings = [(path, shared)]
+    return shared, bindings
+
+
+def _sceneobject_material(stage, sceneobject):
+    material = getattr(sceneobject, "material", None)
+    if material is not None:
+        return USDMaterial.from_material(stage, material)
+    if sceneobject.color is not None:
+        return USDMaterial.from_color(stage, sceneobject.color)
+    return None
+
+
+def prim_from_sceneobject(stage: Usd.Stage, sceneobject: SceneObject, parent_path=[], prototypes=None, lods=None) -> Usd.Prim:
     """
     Converts a :class:`compas.scene.SceneObject` to a USD prim.
 
@@ -50,6 +697,10 @@ def prim_from_sceneobject(stage: Usd.Stage, sceneobject: SceneObject, parent_pat
         The scene object to convert.
     parent_path : list[str], optional
         The path to the parent prim.
+    prototypes : dict[str, str], optional
+        The prototype paths by geometry hash, if items should be instanced.
+    lods : dict[str, int | None], optional
+        If given, mesh items are written with level of detail variants, see :func:`prim_from_mesh_arrays_lods`.
 
     Returns
     -------
@@ -64,17 +715,17 @@ def prim_from_sceneobject(stage: Usd.Stage, sceneobject: SceneObject, parent_pat
         else Transformation()
     )
 
-    prim = prim_from_transformation(stage, "/" + "/".join(path), transformation)
+    prim = measure("Transformation", prim_from_transformation, stage, "/" + "/".join(path), transformation)
     if sceneobject.item is not None:
-        prim_from_item(stage, sceneobject.item, parent_path=path)
+        prim_from_item(stage, sceneobject.item, parent_path=path, prototypes=prototypes, lods=lods)
 
     for child in sceneobject.children:
-        prim_from_sceneobject(stage, child, parent_path=path)
+        prim_from_sceneobject(stage, child, parent_path=path, prototypes=prototypes, lods=lods)
 
     return prim
 
 
-def prim_from_item(stage: Usd.Stage, item: Data, parent_path=[]) -> Usd.Prim:
+def prim_from_item(stage: Usd.Stage, item: Data, parent_path=[], prototypes=None, lods=None) -> Usd.Prim:
     """
     Converts a :class:`compas.scene.SceneObject` to a USD prim.
 
@@ -86,17 +737,325 @@ def prim_from_item(stage: Usd.Stage, item: Data, parent_path=[]) -> Usd.Prim:
         The item to convert.
     parent_path : list[str], optional
         The path to the parent prim.
+    prototypes : dict[str, str], optional
+        The prototype paths by geometry hash. If given, the geometry is written
+        once per hash under ``/Prototypes`` and the item prim becomes an
+        instanceable reference to it. New prototypes are added to the dict.
+    lods : dict[str, int | None], optional
+        If given, mesh items are written with level of detail variants, see :func:`prim_from_mesh_arrays_lods`.
 
     Returns
     -------
     :class:`pxr.Usd.Prim`
         The USD prim.
     """
-    path = parent_path + [f"{item.name}"]
-    if isinstance(item, Box):
-        prim = prim_from_box(stage, "/" + "/".join(path), item)
-    elif isinstance(item, Sphere):
-        prim = prim_from_sphere(stage, "/" + "/".join(path), item)
-    elif isinstance(item, Mesh):
-        prim = prim_from_mesh(stage, "/" + "/".join(path), item)
+    path = "/" + "/".join(parent_path + [f"{item.name}"])
+    if prototypes is None:
+        return prim_from_geometry(stage, path, item, lods=lods)
+
+    key = geometry_hash(item)
+    prototype_path = prototypes.get(key)
+    if prototype_path is None:
+        prototype_path = f"{PROTOTYPES_PATH}/{type(item).__name__}_{key[:16]}"
+        if not stage.GetPrimAtPath(PROTOTYPES_PATH):
+            stage.CreateClassPrim(PROTOTYPES_PATH)
+        UsdGeom.Xform.Define(stage, prototype_path)
+        prim_from_geometry(stage, prototype_path + "/geometry", item, lods=lods)
+        prototypes[key] = prototype_path
+
+    prim = UsdGeom.Xform.Define(stage, path).GetPrim()
+    prim.GetReferences().AddInternalReference(prototype_path)
+    prim.SetInstanceable(True)
     return prim
+
+
+def prim_from_geometry(stage: Usd.Stage, path: str, item: Data, lods=None) -> Usd.Prim:
+    """
+    Converts a geometry item to a USD prim at the given path.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    path : str
+        The path of the prim.
+    item : :class:`compas.data.Data`
+        The item to convert.
+    lods : dict[str, int | None], optional
+        If given, mesh items are written with level of detail variants, see :func:`prim_from_mesh_arrays_lods`.
+        Items with another converter registered for their type are written by that converter.
+
+    Returns
+    -------
+    :class:`pxr.Usd.Prim`
+        The USD prim.
+    """
+    converter = PRIM_CONVERTERS.lookup(type(item))
+    arrays = prepared_mesh_arrays(item) if converter is prim_from_mesh else None
+    if lods and converter is prim_from_mesh:
+        return measure("Mesh", prim_from_mesh_arrays_lods, stage, path, *(arrays or arrays_from_mesh(item)), lods)
+    if arrays is not None:
+        return measure(type(item).__name__, prim_from_mesh_arrays, stage, path, *arrays)
+    if converter is not None:
+        return measure(type(item).__name__, converter, stage, path, item)
+    if hasattr(item, "to_vertices_and_faces"):
+        # other shapes are tessellated
+        return measure(type(item).__name__, prim_from_mesh, stage, path, Mesh.from_vertices_and_faces(*item.to_vertices_and_faces()))
+    raise TypeError("Cannot convert item of type {} to a prim: {}".format(type(item).__name__, path))
+
+
+def geometry_hash(item: Data) -> str:
+    """
+    Computes a hash of the geometry of an item, ignoring its name and guid.
+
+    Parameters
+    ----------
+    item : :class:`compas.data.Data`
+        The item.
+
+    Returns
+    -------
+    str
+        The hexadecimal sha256 digest.
+    """
+    h = hashlib.sha256(type(item).__name__.encode())
+    h.update(compas.json_dumps(item.__data__).encode())
+    return h.hexdigest()
+
+
+def spec_from_sceneobject(layer: Sdf.Layer, sceneobject: SceneObject, parent_path=[], prototypes=None) -> Sdf.PrimSpec:
+    """
+    Converts a :class:`compas.scene.SceneObject` to prim specs on a layer, see :func:`prim_from_sceneobject`.
+
+    Parameters
+    ----------
+    layer : :class:`pxr.Sdf.Layer`
+        The layer.
+    sceneobject : :class:`compas.scene.SceneObject`
+        The scene object to convert.
+    parent_path : list[str], optional
+        The path to the parent prim.
+    prototypes : dict[str, str], optional
+        The prototype paths by geometry hash, if items should be instanced.
+
+    Returns
+    -------
+    :class:`pxr.Sdf.PrimSpec`
+        The prim spec.
+    """
+    path = parent_path + [f"{sceneobject.name}"]
+
+    transformation = (
+        sceneobject.transformation
+        if sceneobject.transformation is not None
+        else Transformation()
+    )
+
+    spec = measure("Transformation", spec_from_transformation, layer, "/" + "/".join(path), transformation)
+    if sceneobject.item is not None:
+        spec_from_item(layer, sceneobject.item, parent_path=path, prototypes=prototypes)
+
+    for child in sceneobject.children:
+        spec_from_sceneobject(layer, child, parent_path=path, prototypes=prototypes)
+
+    return spec
+
+
+def spec_from_item(layer: Sdf.Layer, item: Data, parent_path=[], prototypes=None) -> Sdf.PrimSpec:
+    """
+    Converts an item to prim specs on a layer, see :func:`prim_from_item`.
+
+    Parameters
+    ----------
+    layer : :class:`pxr.Sdf.Layer`
+        The layer.
+    item : :class:`compas.data.Data`
+        The item to convert.
+    parent_path : list[str], optional
+        The path to the parent prim.
+    prototypes : dict[str, str], optional
+        The prototype paths by geometry hash, if items should be instanced.
+
+    Returns
+    -------
+    :class:`pxr.Sdf.PrimSpec`
+        The prim spec.
+    """
+    path = "/" + "/".join(parent_path + [f"{item.name}"])
+    if prototypes is None:
+        return spec_from_geometry(layer, path, item)
+
+    key = geometry_hash(item)
+    prototype_path = prototypes.get(key)
+    if prototype_path is None:
+        prototype_path = f"{PROTOTYPES_PATH}/{type(item).__name__}_{key[:16]}"
+        if not layer.GetPrimAtPath(PROTOTYPES_PATH):
+            Sdf.CreatePrimInLayer(layer, PROTOTYPES_PATH).specifier = Sdf.SpecifierClass
+        spec_define(layer, prototype_path, "Xform")
+        spec_from_geometry(layer, prototype_path + "/geometry", item)
+        prototypes[key] = prototype_path
+
+    spec = spec_define(layer, path, "Xform")
+    spec.referenceList.Prepend(Sdf.Reference(primPath=prototype_path))
+    spec.instanceable = True
+    return spec
+
+
+def spec_from_geometry(layer: Sdf.Layer, path: str, item: Data) -> Sdf.PrimSpec:
+    """
+    Converts a geometry item to a prim spec at the given path, see :func:`prim_from_geometry`.
+
+    Parameters
+    ----------
+    layer : :class:`pxr.Sdf.Layer`
+        The layer.
+    path : str
+        The path of the prim.
+    item : :class:`compas.data.Data`
+        The item to convert.
+
+    Returns
+    -------
+    :class:`pxr.Sdf.PrimSpec`
+        The prim spec.
+    """
+    converter = SPEC_CONVERTERS.lookup(type(item))
+    arrays = prepared_mesh_arrays(item) if converter is spec_from_mesh else None
+    if arrays is not None:
+        return measure(type(item).__name__, spec_from_mesh_arrays, layer, path, *arrays)
+    if converter is not None:
+        return measure(type(item).__name__, converter, layer, path, item)
+    if hasattr(item, "to_vertices_and_faces"):
+        return measure(type(item).__name__, spec_from_mesh, layer, path, Mesh.from_vertices_and_faces(*item.to_vertices_and_faces()))
+    raise TypeError("Cannot convert item of type {} to a prim spec: {}".format(type(item).__name__, path))
+
+
+class USDSceneObject(SceneObject):
+    """A scene object whose item is converted from a USD prim only when it is first accessed.
+
+    Parameters
+    ----------
+    prim : :class:`pxr.Usd.Prim`
+        The geometry prim of the item.
+    reader : callable
+        The conversion function, e.g. :func:`box_from_prim`.
+    **kwargs : dict, optional
+        Additional keyword arguments for :class:`compas.scene.SceneObject`.
+
+    Attributes
+    ----------
+    prim : :class:`pxr.Usd.Prim`
+        The geometry prim of the item.
+    is_loaded : bool
+        True if the item has been converted.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        # skip the lookup of a scene object class by item type, the item does not exist yet
+        return object.__new__(cls)
+
+    def __init__(self, prim, reader, **kwargs):
+        super(USDSceneObject, self).__init__(**kwargs)
+        self.prim = prim
+        self.reader = reader
+        # the prim expires with its stage
+        self._stage = prim.GetStage()
+
+    @property
+    def item(self):
+        if self._item is None:
+            self._item = self.reader(self.prim)
+            # an instanced item is named after the instance, not its prototype geometry
+            self._item.name = self.prim.GetParent().GetName() if self.prim.IsInstanceProxy() else self.prim.GetName()
+        return self._item
+
+    @property
+    def is_loaded(self):
+        return self._item is not None
+
+
+def scene_from_stage(stage: Usd.Stage) -> Scene:
+    """
+    Converts a USD stage to a :class:`compas.scene.Scene`.
+
+    Only the hierarchy is read: every transformable or untyped prim becomes a scene
+    object with its local transformation. Other prims, such as the materials under
+    ``/Looks``, are skipped with their children. A geometry prim (``Cube``, ``Sphere``, ``Cylinder``, ``Cone``,
+    ``Capsule`` or ``Mesh``, also inside an instance) becomes the item of its parent scene object, as written
+    by :func:`stage_from_scene`. Items are wrapped in :class:`USDSceneObject` and are
+    converted only when they are first accessed.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage` | str
+        The USD stage, or the file path to open.
+
+    Returns
+    -------
+    :class:`compas.scene.Scene`
+        The scene.
+    """
+    if isinstance(stage, str):
+        stage = Usd.Stage.Open(stage)
+
+    roots = [prim for prim in stage.GetPseudoRoot().GetChildren() if _is_scene_prim(prim)]
+    if len(roots) == 1:
+        scene = Scene(name=roots[0].GetName())
+        root_path = roots[0].GetPath()
+    else:
+        scene = Scene()
+        root_path = Sdf.Path.absoluteRootPath
+
+    # path: [prim, geometry prim, parent path], in depth-first order
+    nodes = {}
+    prims = iter(Usd.PrimRange(stage.GetPseudoRoot()))
+    for prim in prims:
+        path = prim.GetPath()
+        if path == root_path or not path.HasPrefix(root_path) or prim.IsPseudoRoot():
+            continue
+        if not _is_scene_prim(prim):
+            prims.PruneChildren()
+            continue
+        parent_path = path.GetParentPath()
+        geometry = _item_prim(prim)
+        if geometry is None:
+            nodes[path] = [prim, None, parent_path]
+            continue
+        prims.PruneChildren()
+        parent = nodes.get(parent_path)
+        if parent is not None and parent[1] is None:
+            parent[1] = geometry
+        else:
+            nodes[path] = [prim, geometry, parent_path]
+
+    sceneobjects = {root_path: scene.root}
+    for path, (prim, geometry, parent_path) in nodes.items():
+        if geometry is None:
+            sceneobject = Group(name=prim.GetName())
+        else:
+            sceneobject = USDSceneObject(geometry, ITEM_READERS[geometry.GetTypeName()], name=prim.GetName())
+        sceneobject.transformation = _local_transformation(prim)
+        sceneobjects[path] = scene.add(sceneobject, parent=sceneobjects[parent_path])
+    return scene
+
+
+def _is_scene_prim(prim):
+    # groups are Xforms, or untyped like the root prim of a scene
+    return not prim.GetTypeName() or prim.IsA(UsdGeom.Xformable)
+
+
+def _item_prim(prim):
+    if prim.IsInstance():
+        # the geometry of an instance is a child of its prototype
+        children = prim.GetFilteredChildren(Usd.TraverseInstanceProxies())
+        return next((child for child in children if child.GetTypeName() in ITEM_READERS), None)
+    if prim.GetTypeName() in ITEM_READERS:
+        return prim
+    return None
+
+
+def _local_transformation(prim):
+    xformable = UsdGeom.Xformable(prim)
+    if not xformable or not xformable.GetOrderedXformOps():
+        return None
+    return transformation_from_gfmatrix4d(xformable.GetLocalTransformation())
@@ -0,0 +1,211 @@
+"""Writers that author prim specs directly on a :class:`pxr.Sdf.Layer`.
+
+They produce the same opinions as their ``prim_from_*`` counterparts in
+:mod:`compas_usd.conversions.geometry`, but skip the ``UsdGeom`` schema wrappers
+and the change processing of the stage. Wrap bulk calls in a ``Sdf.ChangeBlock``.
+"""
+import numpy as np
+from pxr import Gf
+from pxr import Sdf
+from pxr import UsdGeom
+from pxr import Vt
+
+from .arrays import extent_from_points
+from .arrays import vtarray_from_numpy
+from .geometry import TORUS_KEY
+from .geometry import _axial_extent
+from .geometry import _cone_center_frame
+from .geometry import _patch_arrays
+from .geometry import _torus_arrays
+from .geometry import arrays_from_mesh
+from .transformations import gfmatrix4d_from_transformation
+from .transformations import xform_rotate_from_frame
+
+
+def spec_define(layer, path, type_name=""):
+    """Returns a defined :class:`Sdf.PrimSpec`, creating it if needed.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_define(layer, "/xform", "Xform").specifier == Sdf.SpecifierDef
+    True
+    """
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = Sdf.SpecifierDef
+    if type_name:
+        spec.typeName = type_name
+    return spec
+
+
+def spec_attribute(spec, name, type_name, value, variability=Sdf.VariabilityVarying):
+    """Returns a new :class:`Sdf.AttributeSpec` with a default value."""
+    attribute = Sdf.AttributeSpec(spec, name, type_name, variability)
+    attribute.default = value
+    return attribute
+
+
+def spec_xform_op_order(spec, ops):
+    """Authors the ``xformOpOrder`` of a prim spec."""
+    return spec_attribute(spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, Vt.TokenArray(ops), Sdf.VariabilityUniform)
+
+
+def spec_from_box(layer, path, box):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Cube``, see :func:`prim_from_box`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_box(layer, "/box", Box(1.0)).typeName
+    'Cube'
+    """
+    spec = spec_define(layer, path, "Cube")
+    spec_attribute(spec, "size", Sdf.ValueTypeNames.Double, 1.0)
+    spec_attribute(spec, "extent", Sdf.ValueTypeNames.Float3Array, _axial_extent(0.5, 0.5))
+    spec_attribute(spec, "xformOp:scale", Sdf.ValueTypeNames.Float3, Gf.Vec3f(box.xsize, box.ysize, box.zsize))
+    _spec_rotate_and_translate(spec, box.frame)
+    spec_xform_op_order(spec, ["xformOp:translate", "xformOp:rotateXYZ", "xformOp:scale"])
+    return spec
+
+
+def spec_from_sphere(layer, path, sphere):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Sphere``, see :func:`prim_from_sphere`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_sphere(layer, "/sphere", Sphere(1.0)).typeName
+    'Sphere'
+    """
+    spec = spec_define(layer, path, "Sphere")
+    spec_attribute(spec, "radius", Sdf.ValueTypeNames.Double, sphere.radius)
+    spec_attribute(spec, "extent", Sdf.ValueTypeNames.Float3Array, _axial_extent(sphere.radius, sphere.radius))
+    spec_attribute(spec, "xformOp:translate", Sdf.ValueTypeNames.Double3, Gf.Vec3d(*sphere.frame.point))
+    spec_xform_op_order(spec, ["xformOp:translate"])
+    return spec
+
+
+def spec_from_cylinder(layer, path, cylinder):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Cylinder``, see :func:`prim_from_cylinder`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_cylinder(layer, "/cylinder", Cylinder(1.0, 3.0)).typeName
+    'Cylinder'
+    """
+    return _spec_from_axial_shape(layer, path, "Cylinder", cylinder.radius, cylinder.height, cylinder.frame, 0.5 * cylinder.height)
+
+
+def spec_from_cone(layer, path, cone):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Cone``, see :func:`prim_from_cone`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_cone(layer, "/cone", Cone(1.0, 3.0)).typeName
+    'Cone'
+    """
+    return _spec_from_axial_shape(layer, path, "Cone", cone.radius, cone.height, _cone_center_frame(cone.frame, cone.height), 0.5 * cone.height)
+
+
+def spec_from_capsule(layer, path, capsule):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Capsule``, see :func:`prim_from_capsule`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_capsule(layer, "/capsule", Capsule(1.0, 3.0)).typeName
+    'Capsule'
+    """
+    return _spec_from_axial_shape(layer, path, "Capsule", capsule.radius, capsule.height, capsule.frame, 0.5 * capsule.height + capsule.radius)
+
+
+def spec_from_torus(layer, path, torus, u=32, v=16):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Mesh`` of a torus, see :func:`prim_from_torus`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_torus(layer, "/torus", Torus(2.0, 0.5)).typeName
+    'Mesh'
+    """
+    spec = spec_from_mesh_arrays(layer, path, *_torus_arrays(torus, u, v))
+    # a key path is a nested dictionary, as with Usd.Object.SetCustomDataByKey
+    data = {"radius_axis": torus.radius_axis, "radius_pipe": torus.radius_pipe}
+    for key in reversed(TORUS_KEY.split(":")):
+        data = {key: data}
+    spec.customData = data
+    _spec_rotate_and_translate(spec, torus.frame)
+    spec_xform_op_order(spec, ["xformOp:translate", "xformOp:rotateXYZ"])
+    return spec
+
+
+def spec_from_mesh(layer, path, mesh):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Mesh``, see :func:`prim_from_mesh`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_mesh(layer, "/mesh", Mesh.from_meshgrid(1.0, 2)).typeName
+    'Mesh'
+    """
+    return spec_from_mesh_arrays(layer, path, *arrays_from_mesh(mesh))
+
+
+def spec_from_mesh_arrays(layer, path, points, face_vertex_counts, face_vertex_indices):
+    """Returns a :class:`Sdf.PrimSpec` of a ``Mesh`` from flat arrays, see :func:`prim_from_mesh_arrays`."""
+    spec = spec_define(layer, path, "Mesh")
+    spec_attribute(spec, "points", Sdf.ValueTypeNames.Point3fArray, vtarray_from_numpy(Vt.Vec3fArray, points, np.float32))
+    spec_attribute(spec, "faceVertexCounts", Sdf.ValueTypeNames.IntArray, vtarray_from_numpy(Vt.IntArray, face_vertex_counts, np.int32))
+    spec_attribute(spec, "faceVertexIndices", Sdf.ValueTypeNames.IntArray, vtarray_from_numpy(Vt.IntArray, face_vertex_indices, np.int32))
+    spec_attribute(spec, "extent", Sdf.ValueTypeNames.Float3Array, extent_from_points(points))
+    return spec
+
+
+def spec_from_surface(layer, path, surface):
+    """Returns a :class:`Sdf.PrimSpec` of a ``NurbsPatch``, see :func:`prim_from_surface`."""
+    points, weights = _patch_arrays(surface)
+    spec = spec_define(layer, path, "NurbsPatch")
+    spec_attribute(spec, "uVertexCount", Sdf.ValueTypeNames.Int, len(surface.points))
+    spec_attribute(spec, "vVertexCount", Sdf.ValueTypeNames.Int, len(surface.points[0]))
+    spec_attribute(spec, "uOrder", Sdf.ValueTypeNames.Int, surface.degree_u + 1)
+    spec_attribute(spec, "vOrder", Sdf.ValueTypeNames.Int, surface.degree_v + 1)
+    spec_attribute(spec, "uKnots", Sdf.ValueTypeNames.DoubleArray, Vt.DoubleArray(surface.knotvector_u))
+    spec_attribute(spec, "vKnots", Sdf.ValueTypeNames.DoubleArray, Vt.DoubleArray(surface.knotvector_v))
+    spec_attribute(spec, "pointWeights", Sdf.ValueTypeNames.DoubleArray, vtarray_from_numpy(Vt.DoubleArray, weights, np.float64))
+    spec_attribute(spec, "points", Sdf.ValueTypeNames.Point3fArray, vtarray_from_numpy(Vt.Vec3fArray, points, np.float32))
+    spec_attribute(spec, "extent", Sdf.ValueTypeNames.Float3Array, extent_from_points(points))
+    return spec
+
+
+def spec_from_transformation(layer, path, transformation):
+    """Returns a :class:`Sdf.PrimSpec` of an ``Xform``, see :func:`prim_from_transformation`.
+
+    Examples
+    --------
+    >>> layer = Sdf.Layer.CreateAnonymous()
+    >>> spec_from_transformation(layer, "/xform", Transformation()).typeName
+    'Xform'
+    """
+    spec = spec_define(layer, path, "Xform")
+    spec_attribute(spec, "xformOp:transform", Sdf.ValueTypeNames.Matrix4d, gfmatrix4d_from_transformation(transformation))
+    spec_xform_op_order(spec, ["xformOp:transform"])
+    return spec
+
+
+def _spec_from_axial_shape(layer, path, type_name, radius, height, frame, half_extent):
+    spec = spec_define(layer, path, type_name)
+    spec_attribute(spec, "height", Sdf.ValueTypeNames.Double, height)
+    spec_attribute(spec, "radius", Sdf.ValueTypeNames.Double, radius)
+    spec_attribute(spec, "axis", Sdf.ValueTypeNames.Token, UsdGeom.Tokens.z, Sdf.VariabilityUniform)
+    spec_attribute(spec, "extent", Sdf.ValueTypeNames.Float3Array, _axial_extent(radius, half_extent))
+    _spec_rotate_and_translate(spec, frame)
+    spec_xform_op_order(spec, ["xformOp:translate", "xformOp:rotateXYZ"])
+    return spec
+
+
+def _spec_rotate_and_translate(spec, frame):
+    euler_angles = xform_rotate_from_frame(frame, UsdGeom.XformCommonAPI.RotationOrderXYZ)
+    spec_attribute(spec, "xformOp:rotateXYZ", Sdf.ValueTypeNames.Float3, Gf.Vec3f(*euler_angles))
+    spec_attribute(spec, "xformOp:translate", Sdf.ValueTypeNames.Double3, Gf.Vec3d(*frame.point))
@@ -1,5 +1,10 @@
 import math
+
+import numpy as np
 from pxr import Gf
+from pxr import Sdf
+from pxr import Usd
+from pxr import Vt
 from pxr import UsdGeom
 
 from compas.geometry import Frame
@@ -44,6 +49,90 @@ def gfvec3f_and_gfquatd_from_frame(frame):
     return Gf.Vec3f(*frame.point), Gf.Quatd(w, x, y, z)
 
 
+def vtmatrix4darray_from_transformations(transformations):
+    """Converts many transformations to a :class:`Vt.Matrix4dArray` in one operation.
+
+    Parameters
+    ----------
+    transformations : list[:class:`Transformation`] | list[:class:`Frame`] | array-like
+        The transformations, frames, or an array of shape (N, 4, 4).
+
+    Returns
+    -------
+    :class:`Vt.Matrix4dArray`
+
+    Examples
+    --------
+    >>> frame = Frame((0, 3, 4), (0.27, 0.95, 0.13), (-0.95, 0.28, -0.09))
+    >>> t1 = Transformation.from_frame(frame)
+    >>> array = vtmatrix4darray_from_transformations([t1, t1])
+    >>> array[1] == gfmatrix4d_from_transformation(t1)
+    True
+    >>> transformations_from_vtmatrix4darray(array)[0] == t1
+    True
+    """
+    matrices = matrices_from_transformations(transformations)
+    # Gf matrices are row-major with row vectors, i.e. transposed
+    return Vt.Matrix4dArray.FromNumpy(np.ascontiguousarray(matrices.transpose(0, 2, 1)))
+
+
+def matrices_from_vtmatrix4darray(vtmatrix4darray):
+    """Converts a :class:`Vt.Matrix4dArray` to an array of compas matrices in one operation.
+
+    Parameters
+    ----------
+    vtmatrix4darray : :class:`Vt.Matrix4dArray`
+        The matrices.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The matrices, shape (N, 4, 4), in the convention of :class:`Transformation`.
+    """
+    return np.asarray(vtmatrix4darray, dtype=np.float64).reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
+def transformations_from_vtmatrix4darray(vtmatrix4darray):
+    """Converts a :class:`Vt.Matrix4dArray` to a list of :class:`Transformation`
+
+    Parameters
+    ----------
+    vtmatrix4darray : :class:`Vt.Matrix4dArray`
+        The matrices.
+
+    Returns
+    -------
+    list[:class:`Transformation`]
+    """
+    return [Transformation(matrix) for matrix in matrices_from_vtmatrix4darray(vtmatrix4darray).tolist()]
+
+
+def gfvec3f_and_gfquatd_from_frames(frames):
+    """Converts many frames to translations and orientations in one operation.
+
+    Parameters
+    ----------
+    frames : list[:class:`Frame`] | array-like
+        The frames, or an array of matrices of shape (N, 4, 4).
+
+    Returns
+    -------
+    tuple[:class:`Vt.Vec3fArray`, :class:`Vt.QuatdArray`]
+
+    Examples
+    --------
+    >>> frame = Frame((0, 3, 4), (0.27, 0.95, 0.13), (-0.95, 0.28, -0.09))
+    >>> translations, orientations = gfvec3f_and_gfquatd_from_frames([frame])
+    >>> translation, orientation = gfvec3f_and_gfquatd_from_frame(frame)
+    >>> translations[0] == translation, Gf.IsClose(orientations[0].GetImaginary(), orientation.GetImaginary(), 1e-9)
+    (True, True)
+    """
+    translations, quaternions, _ = decompose_matrices(matrices_from_transformations(frames))
+    # Gf.Quatd is stored as (i, j, k, real)
+    orientations = np.ascontiguousarray(np.roll(quaternions, -1, axis=1))
+    return Vt.Vec3fArray.FromNumpy(translations.astype(np.float32)), Vt.QuatdArray.FromNumpy(orientations)
+
+
 def xform_rotate_from_frame(frame, rotation_order):
     """Returns euler angles for UsdGeom.XformCommonAPI from a :class:`Frame`
 
@@ -87,6 +176,60 @@ def frame_and_scale_from_prim(prim):
     return frame, scale
 
 
+def transformations_from_prims(stage, paths, time=None, as_array=False, cache=None):
+    """Returns the world transformations of many prims of a stage.
+
+    All matrices are computed with one :class:`UsdGeom.XformCache`, so the matrix of
+    an ancestor shared by several prims is computed only once.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    paths : list[str | :class:`pxr.Sdf.Path`]
+        The paths of the prims.
+    time : float, optional
+        The time code. Defaults to the default time code.
+    as_array : bool, optional
+        If True, return an array of shape (N, 4, 4) instead of transformations.
+    cache : :class:`UsdGeom.XformCache`, optional
+        A cache to reuse between calls. If given, ``time`` is ignored.
+
+    Returns
+    -------
+    list[:class:`Transformation`] | :class:`numpy.ndarray`
+        The transformations, or the matrices in the convention of :class:`Transformation`.
+
+    Raises
+    ------
+    ValueError
+        If there is no prim at one of the paths.
+
+    Examples
+    --------
+    >>> from pxr import Usd
+    >>> from compas.geometry import Translation
+    >>> stage = Usd.Stage.CreateInMemory()
+    >>> parent = UsdGeom.Xform.Define(stage, "/parent")
+    >>> child = UsdGeom.Xform.Define(stage, "/parent/child")
+    >>> apply_transformation_on_prim(parent, Translation.from_vector([1, 0, 0]))
+    >>> apply_transformation_on_prim(child, Translation.from_vector([0, 2, 0]))
+    >>> transformations_from_prims(stage, ["/parent/child"], as_array=True)[0][:3, 3].tolist()
+    [1.0, 2.0, 0.0]
+    """
+    if cache is None:
+        cache = UsdGeom.XformCache(Usd.TimeCode.Default() if time is None else Usd.TimeCode(time))
+    matrices = Vt.Matrix4dArray(len(paths))
+    for i, path in enumerate(paths):
+        prim = stage.GetPrimAtPath(str(path))
+        if not prim:
+            raise ValueError("There is no prim at {}".format(path))
+        matrices[i] = cache.GetLocalToWorldTransform(prim)
+    if as_array:
+        return matrices_from_vtmatrix4darray(matrices)
+    return transformations_from_vtmatrix4darray(matrices)
+
+
 def apply_transformation_on_prim(prim, transformation):
     """ """
     xform = UsdGeom.Xformable(prim)
@@ -104,6 +247,195 @@ def apply_rotate_and_translate_on_prim(prim, frame):
     UsdGeom.XformCommonAPI(prim).SetTranslate(tuple(frame.point))
 
 
+def apply_transformations_on_prim(prim, transformations, start_time=0.0, time_step=1.0, chunk_size=1000):
+    """Writes a sequence of transformations as time samples of one ``xformOp:transform``.
+
+    The transformations are consumed one at a time, so a generator keeps the full
+    trajectory out of memory. The samples are written directly to the layer of the
+    edit target, ``chunk_size`` samples per ``Sdf.ChangeBlock``.
+
+    Parameters
+    ----------
+    prim : :class:`pxr.Usd.Prim` | :class:`pxr.UsdGeom.Xformable`
+        The prim. An existing ``xformOp:transform`` is reused, otherwise one is added.
+    transformations : iterable[:class:`compas.geometry.Transformation`]
+        The transformation of every frame.
+    start_time : float, optional
+        The time code of the first frame.
+    time_step : float, optional
+        The time code increment per frame.
+    chunk_size : int, optional
+        The number of samples written per change block.
+
+    Returns
+    -------
+    float | None
+        The time code of the last sample, or None if there were no transformations.
+
+    Examples
+    --------
+    >>> from pxr import Usd
+    >>> from compas.geometry import Translation
+    >>> stage = Usd.Stage.CreateInMemory()
+    >>> xform = UsdGeom.Xform.Define(stage, "/xform")
+    >>> apply_transformations_on_prim(xform, (Translation.from_vector([i, 0, 0]) for i in range(100)))
+    99.0
+    """
+    xform = UsdGeom.Xformable(prim)
+    op = next((op for op in xform.GetOrderedXformOps() if op.GetOpName() == "xformOp:transform"), None) or xform.AddTransformOp()
+    transformations = iter(transformations)
+    first = next(transformations, None)
+    if first is None:
+        return None
+
+    # the first sample creates the attribute spec in the edit target
+    time = float(start_time)
+    op.Set(gfmatrix4d_from_transformation(first), time)
+    layer = xform.GetPrim().GetStage().GetEditTarget().GetLayer()
+    path = op.GetAttr().GetPath()
+
+    done = False
+    while not done:
+        with Sdf.ChangeBlock():
+            for _ in range(chunk_size):
+                transformation = next(transformations, None)
+                if transformation is None:
+                    done = True
+                    break
+                time += time_step
+                layer.SetTimeSample(path, time, gfmatrix4d_from_transformation(transformation))
+    return time
+
+
 def translate_and_orient_from_frame(frame):
     w, x, y, z = Rotation.from_frame(frame).quaternion.wxyz
     return Gf.Vec3f(*frame.point), Gf.Quatd(w, x, y, z)
+
+
+def matrices_from_transformations(transformations):
+    """Returns the matrices of many transformations or frames as one NumPy array.
+
+    Parameters
+    ----------
+    transformations : list[:class:`Transformation`] | list[:class:`Frame`] | array-like
+        The transformations, the frames to transform from the world XY frame to,
+        or an array of shape (N, 4, 4).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The matrices, shape (N, 4, 4), in row-major order (translation in the last column).
+
+    Examples
+    --------
+    >>> frame = Frame((1, 2, 3), (0, 1, 0), (-1, 0, 0))
+    >>> a = matrices_from_transformations([frame])
+    >>> b = matrices_from_transformations([Transformation.from_frame(frame)])
+    >>> np.allclose(a, b)
+    True
+    """
+    if isinstance(transformations, np.ndarray):
+        return transformations.reshape(-1, 4, 4).astype(np.float64, copy=False)
+    transformations = list(transformations)
+    if transformations and isinstance(transformations[0], Frame):
+        return matrices_from_frames(transformations)
+    if transformations and isinstance(transformations[0], Transformation):
+        return np.array([t.matrix for t in transformations], dtype=np.float64).reshape(-1, 4, 4)
+    return np.array(transformations, dtype=np.float64).reshape(-1, 4, 4)
+
+
+def matrices_from_frames(frames):
+    """Returns the matrices that transform the world XY frame to many frames.
+
+    Parameters
+    ----------
+    frames : list[:class:`Frame`]
+        The frames.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The matrices, shape (N, 4, 4).
+    """
+    data = np.array([[frame.point, frame.xaxis, frame.yaxis] for frame in frames], dtype=np.float64).reshape(-1, 3, 3)
+    xaxis = data[:, 1] / np.linalg.norm(data[:, 1], axis=1)[:, None]
+    yaxis = data[:, 2] / np.linalg.norm(data[:, 2], axis=1)[:, None]
+    matrices = np.zeros((len(data), 4, 4))
+    matrices[:, :3, 0] = xaxis
+    matrices[:, :3, 1] = yaxis
+    matrices[:, :3, 2] = np.cross(xaxis, yaxis)
+    matrices[:, :3, 3] = data[:, 0]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def decompose_matrices(matrices):
+    """Decomposes many matrices into translations, rotations and scales at once.
+
+    Shear and perspective components are ignored. The scale factors are the norms of
+    the columns of the matrices, so the x scale factor of a reflection is negative.
+
+    Parameters
+    ----------
+    matrices : array-like
+        The matrices, shape (N, 4, 4).
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The translations (N, 3), the unit quaternions (N, 4) in ``w, x, y, z``
+        order and the scale factors (N, 3).
+
+    Examples
+    --------
+    >>> T = Transformation.from_frame(Frame((1, 2, 3), (0, 1, 0), (-1, 0, 0))) * Scale.from_factors([2, 2, 2])
+    >>> translations, quaternions, scales = decompose_matrices([T.matrix])
+    >>> np.allclose(translations, [[1, 2, 3]]), np.allclose(scales, [[2, 2, 2]])
+    (True, True)
+    >>> np.allclose(quaternions, [Rotation.from_frame(Frame((1, 2, 3), (0, 1, 0), (-1, 0, 0))).quaternion.wxyz])
+    True
+    """
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    translations = matrices[:, :3, 3].copy()
+    scales = np.linalg.norm(matrices[:, :3, :3], axis=1)
+    # a reflection cannot be a rotation, it is moved into the x scale factor
+    scales[np.linalg.det(matrices[:, :3, :3]) < 0, 0] *= -1
+    rotations = matrices[:, :3, :3] / np.where(scales == 0, 1.0, scales)[:, None, :]
+    return translations, quaternions_from_rotations(rotations), scales
+
+
+def quaternions_from_rotations(rotations):
+    """Converts many rotation matrices to unit quaternions at once.
+
+    Parameters
+    ----------
+    rotations : array-like
+        The rotation matrices, shape (N, 3, 3).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The quaternions, shape (N, 4), in ``w, x, y, z`` order with ``w >= 0``.
+    """
+    R = np.asarray(rotations, dtype=np.float64).reshape(-1, 3, 3)
+    m00, m11, m22 = R[:, 0, 0], R[:, 1, 1], R[:, 2, 2]
+    # per matrix, pick the numerically most stable of the four standard formulas
+    s = 2.0 * np.sqrt(np.maximum(1.0 + np.stack([m00 + m11 + m22, m00 - m11 - m22, m11 - m00 - m22, m22 - m00 - m11]), 1e-12))
+    a = R[:, 2, 1] - R[:, 1, 2]
+    b = R[:, 0, 2] - R[:, 2, 0]
+    c = R[:, 1, 0] - R[:, 0, 1]
+    d = R[:, 0, 1] + R[:, 1, 0]
+    e = R[:, 0, 2] + R[:, 2, 0]
+    f = R[:, 1, 2] + R[:, 2, 1]
+    candidates = np.stack(
+        [
+            np.stack([s[0] / 4, a / s[0], b / s[0], c / s[0]], axis=-1),
+            np.stack([a / s[1], s[1] / 4, d / s[1], e / s[1]], axis=-1),
+            np.stack([b / s[2], d / s[2], s[2] / 4, f / s[2]], axis=-1),
+            np.stack([c / s[3], e / s[3], f / s[3], s[3] / 4], axis=-1),
+        ]
+    )
+    case = np.argmax(np.stack([m00 + m11 + m22, m00, m11, m22]), axis=0)
+    quaternions = candidates[case, np.arange(len(R))]
+    quaternions *= np.where(quaternions[:, :1] < 0, -1.0, 1.0)
+    return quaternions / np.linalg.norm(quaternions, axis=1)[:, None]
@@ -11,9 +11,15 @@ compas_usd.material
 from __future__ import absolute_import
 
 from .material import USDMaterial
+from .material import USDMaterialRegistry
 from .material import USDPreviewSurface
+from .material import material_hash
+from .textures import USDTextureAssets
 
 __all__ = [
     "USDMaterial",
+    "USDMaterialRegistry",
     "USDPreviewSurface",
+    "material_hash",
+    "USDTextureAssets",
 ]
@@ -2,14 +2,23 @@
 # https://github.com/kcoley/gltf2usd/blob/master/Source/_gltf2usd/usd_material.py
 # https://github.com/ColinKennedy/USD-Cookbook/blob/master/concepts/mesh_with_materials/python/material.py
 """
+import hashlib
 import os
+import weakref
 
 from enum import Enum
+import compas
+from compas.data import Data
 from pxr import Gf
 from pxr import Sdf
 from pxr import UsdShade
 from pxr import UsdGeom
 
+from .textures import USDTextureAssets
+
+
+MATERIAL_HASH_KEY = "compas:materialHash"
+
 
 class AlphaMode(object):  # todo import from somewhere else?
     BLEND = "BLEND"
@@ -20,10 +29,11 @@ class AlphaMode(object):  # todo import from somewhere else?
 class USDMaterial(object):
     """Wrapper about UsdShade.Material"""
 
-    def __init__(self, stage, name=None, path=None, materials_path="/Looks", textures=None, image_uris=None):
+    def __init__(self, stage, name=None, path=None, materials_path="/Looks", textures=None, image_uris=None, texture_assets=None):
         self.stage = stage
         self.textures = textures
         self.image_uris = image_uris
+        self.texture_assets = texture_assets or USDTextureAssets.from_stage(stage)
 
         if not stage.GetPrimAtPath(materials_path):
             UsdGeom.Scope.Define(stage, materials_path)
@@ -42,11 +52,50 @@ class USDMaterial(object):
     def GetPath(self):
         return self.material.GetPath()
 
+    def bind(self, prim):
+        """Binds the material to a prim and its descendants through ``UsdShade.MaterialBindingAPI``."""
+        prim = prim.GetPrim() if hasattr(prim, "GetPrim") else prim
+        UsdShade.MaterialBindingAPI.Apply(prim).Bind(UsdShade.Material(self.material))
+        return self
+
     @classmethod
-    def from_material(cls, stage, material, image_uris=None, textures=None):  # TODO: move to compas_xr?
-        """Create a material from a :class:compas_xr.datastructures.material"""
-        umat = cls(stage, material.name, image_uris=image_uris, textures=textures)
+    def from_material(cls, stage, material, image_uris=None, textures=None, registry=None, texture_assets=None):  # TODO: move to compas_xr?
+        """Create a material from a :class:compas_xr.datastructures.material
+
+        Materials are deduplicated by content: if the registry of the stage already
+        holds a material with the same data, textures and image uris, that material
+        is returned instead of defining a new shader network.
+        See :class:`USDMaterialRegistry`.
+        Texture files are copied next to the stage by ``texture_assets``,
+        see :class:`USDTextureAssets`.
+        """
+        registry = registry or USDMaterialRegistry.from_stage(stage)
+        key = material_hash(material, image_uris=image_uris, textures=textures)
+        umat = registry.get(key)
+        if umat is not None:
+            return umat
+        umat = cls(stage, registry.available_name(material.name), materials_path=registry.materials_path, image_uris=image_uris, textures=textures, texture_assets=texture_assets)
         umat.shader = USDPreviewSurface.from_material(material, stage, umat)
+        registry.add(key, umat)
+        return umat
+
+    @classmethod
+    def from_color(cls, stage, color, registry=None):
+        """Create a preview surface material of a single :class:`compas.colors.Color`
+
+        Like :meth:`from_material`, materials of the same color are reused.
+        """
+        registry = registry or USDMaterialRegistry.from_stage(stage)
+        key = material_hash(color)
+        umat = registry.get(key)
+        if umat is not None:
+            return umat
+        umat = cls(stage, registry.available_name("color_" + color.hex[1:]), materials_path=registry.materials_path)
+        umat.shader = USDPreviewSurface(stage, umat)
+        umat.shader._diffuse_color.Set(Gf.Vec3f(*color.rgb))
+        if color.a < 1.0:
+            umat.shader._opacity.Set(color.a)
+        registry.add(key, umat)
         return umat
 
     @classmethod
@@ -112,13 +161,122 @@ class USDMaterial(object):
         )
 
 
+class USDMaterialRegistry(object):
+    """Registry of the materials of a stage by content hash.
+
+    The hash of every registered material is stored in the ``customData`` of its prim,
+    so a registry created for an existing stage also finds the materials written by
+    earlier sessions.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    materials_path : str, optional
+        The path of the scope of the materials.
+    """
+
+    _stages = weakref.WeakKeyDictionary()
+
+    def __init__(self, stage, materials_path="/Looks"):
+        # only weak references to the stage, so the registries of the class cache
+        # do not keep their stages alive
+        self._stage = weakref.ref(stage)
+        self._materials = weakref.WeakValueDictionary()
+        self.materials_path = materials_path
+        self.paths = {}
+        scope = stage.GetPrimAtPath(materials_path)
+        if scope:
+            for prim in scope.GetChildren():
+                key = prim.GetCustomDataByKey(MATERIAL_HASH_KEY)
+                if key:
+                    self.paths[key] = prim.GetPath()
+
+    @property
+    def stage(self):
+        """The USD stage, or None if it has been released."""
+        return self._stage()
+
+    @classmethod
+    def from_stage(cls, stage):
+        """Returns the registry of a stage, creating it on first use."""
+        registry = cls._stages.get(stage)
+        if registry is None:
+            registry = cls._stages[stage] = cls(stage)
+        return registry
+
+    def get(self, key):
+        """Returns the material with the given content hash, or None.
+
+        The same :class:`USDMaterial` is returned as long as it is referenced elsewhere.
+        """
+        usd_material = self._materials.get(key)
+        if usd_material is None and key in self.paths:
+            usd_material = self._materials[key] = USDMaterial.from_path(self.stage, self.paths[key])
+        return usd_material
+
+    def add(self, key, usd_material):
+        """Registers a material under its content hash."""
+        self.stage.GetPrimAtPath(usd_material.GetPath()).SetCustomDataByKey(MATERIAL_HASH_KEY, key)
+        self.paths[key] = usd_material.GetPath()
+        self._materials[key] = usd_material
+
+    def available_name(self, name):
+        """Returns ``name``, or ``name`` with a numeric suffix if a different material already uses it."""
+        name = name or "material"
+        candidate = name
+        i = 0
+        while self.stage.GetPrimAtPath(Sdf.Path(self.materials_path).AppendChild(candidate)):
+            i += 1
+            candidate = "{}_{}".format(name, i)
+        return candidate
+
+
+def material_hash(material, image_uris=None, textures=None):
+    """Computes a hash of the content of a material, ignoring its name and guid.
+
+    Parameters
+    ----------
+    material : :class:`compas.data.Data` | object
+        The material.
+    image_uris : list[str], optional
+        The image uris of the textures of the material.
+    textures : list, optional
+        The textures of the material.
+
+    Returns
+    -------
+    str
+        The hexadecimal sha256 digest.
+    """
+    h = hashlib.sha256(type(material).__name__.encode())
+    h.update(compas.json_dumps([_content(material), image_uris, _content(textures)]).encode())
+    return h.hexdigest()
+
+
+def _content(value):
+    if isinstance(value, Data):
+        return value.__data__
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return [_content(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _content(v) for k, v in value.items()}
+    if hasattr(value, "__dict__"):
+        return {k: _content(v) for k, v in vars(value).items() if k not in ("name", "guid")}
+    return value
+
+
 class USDPreviewSurface(object):
     """Material that models a physically based surface for USD."""
 
     def __init__(self, stage, material, scale_texture=False):
         self.stage = stage
         self.scale_texture = scale_texture
-        self.material = material  # USDMaterial
+        # the material keeps its preview surface as ``shader``, a weak back reference avoids
+        # a cycle that would keep the stage alive until the next garbage collection
+        self._material = weakref.ref(material)  # USDMaterial
         self.shader = UsdShade.Shader.Define(stage, material.GetPath().AppendChild("Shader"))  # why not already defined in material.. multiple shader possible?
         self.shader.CreateIdAttr("UsdPreviewSurface")
 
@@ -151,6 +309,11 @@ class USDPreviewSurface(object):
         self._st0 = USDPrimvarReaderFloat2(self.stage, self.material.GetPath(), "st0")
         self._st1 = USDPrimvarReaderFloat2(self.stage, self.material.GetPath(), "st1")
 
+    @property
+    def material(self):
+        """The :class:`USDMaterial` of the preview surface, or None if it has been released."""
+        return self._material()
+
     @classmethod
     def from_material(cls, material, stage, usd_material):
         ps = cls(stage, usd_material)
@@ -356,7 +519,7 @@ class USDUVTexture(object):
         self._scale = self._texture_shader.CreateInput("scale", Sdf.ValueTypeNames.Float4)
         self._scale.Set(scale_factor)
         self._file_asset = self._texture_shader.CreateInput("file", Sdf.ValueTypeNames.Asset)
-        self._file_asset.Set(texture.file)
+        self._file_asset.Set(usd_material.texture_assets.asset_path(texture.file))
         self._fallback = self._texture_shader.CreateInput("fallback", Sdf.ValueTypeNames.Float4)
         self._fallback.Set(fallback)
         self._st = self._texture_shader.CreateInput("st", Sdf.ValueTypeNames.Float2)
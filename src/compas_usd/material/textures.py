@@ -0,0 +1,158 @@
+import functools
+import hashlib
+import os
+import shutil
+import weakref
+
+
+class USDTextureAssets(object):
+    """Copies the textures of a stage into a folder next to it, once per unique image.
+
+    Every texture file is identified by the sha256 hash of its bytes and copied to
+    ``<folder>/<hash><ext>`` relative to the root layer of the stage, so the same image
+    referenced from different paths is stored and loaded once. With ``max_size``,
+    larger images are downscaled, and the downscaled variants are kept in
+    ``cache_dir`` by content hash. Files that already exist are not written again,
+    so repeated exports do no image work.
+
+    Parameters
+    ----------
+    stage : :class:`pxr.Usd.Stage`
+        The USD stage.
+    folder : str, optional
+        The folder of the textures, relative to the root layer.
+    max_size : int, optional
+        The maximum width and height of the textures in pixels. Requires Pillow.
+    cache_dir : str, optional
+        The folder of the downscaled variants. Defaults to the texture folder.
+    """
+
+    _stages = weakref.WeakKeyDictionary()
+
+    def __init__(self, stage, folder="textures", max_size=None, cache_dir=None):
+        # a weak reference, so the assets of the class cache do not keep their stage alive
+        self._stage = weakref.ref(stage)
+        self.folder = folder
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.assets = {}
+
+    @classmethod
+    def from_stage(cls, stage):
+        """Returns the texture assets of a stage with the default settings, creating them on first use."""
+        assets = cls._stages.get(stage)
+        if assets is None:
+            assets = cls._stages[stage] = cls(stage)
+        return assets
+
+    @property
+    def stage(self):
+        """The USD stage, or None if it has been released."""
+        return self._stage()
+
+    @property
+    def root(self):
+        """The folder of the root layer, or None if the stage is in memory."""
+        path = self.stage.GetRootLayer().realPath
+        return os.path.dirname(path) if path else None
+
+    def asset_path(self, file_path):
+        """Returns the stage-relative asset path of a texture, copying or downscaling it if needed.
+
+        Parameters
+        ----------
+        file_path : str
+            The path of the image file.
+
+        Returns
+        -------
+        str
+            The asset path, e.g. ``"./textures/<hash>.png"``. If the stage is in memory or
+            the file does not exist (e.g. an URI), ``file_path`` is returned unchanged.
+        """
+        if self.root is None or not os.path.isfile(file_path):
+            return file_path
+        asset = self.assets.get(file_path)
+        if asset is None:
+            asset = self.assets[file_path] = self._add(file_path)
+        return asset
+
+    def _add(self, file_path):
+        key = file_hash(file_path)[:16]
+        ext = os.path.splitext(file_path)[1].lower()
+        source = file_path
+        name = key + ext
+        if self.max_size:
+            name = "{}_{}{}".format(key, self.max_size, ext)
+            source = downscaled_texture(file_path, os.path.join(self.cache_dir or os.path.join(self.root, self.folder), name), self.max_size)
+
+        target = os.path.join(self.root, self.folder, name)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+        return "./" + "/".join([self.folder, name])
+
+
+def file_hash(file_path):
+    """Returns the sha256 hash of the bytes of a file.
+
+    The hashes of the most recently used files are remembered by path, modification
+    time and size, so unchanged files are read only once.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest.
+    """
+    stat = os.stat(file_path)
+    return _file_hash(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_hash(file_path, mtime, size):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def downscaled_texture(file_path, cache_path, max_size):
+    """Returns the path of a copy of an image that fits within ``max_size`` pixels.
+
+    The copy is written to ``cache_path`` only if it does not exist yet.
+    Images that already fit are copied unchanged.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the image file.
+    cache_path : str
+        The path of the downscaled image.
+    max_size : int
+        The maximum width and height in pixels.
+
+    Returns
+    -------
+    str
+    """
+    if os.path.exists(cache_path):
+        return cache_path
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Downscaling textures requires Pillow: pip install compas_usd[textures]")
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with Image.open(file_path) as image:
+        if max(image.size) <= max_size:
+            shutil.copyfile(file_path, cache_path)
+        else:
+            image.thumbnail((max_size, max_size))
+            image.save(cache_path)
+    return cache_path
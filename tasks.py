@@ -174,6 +174,22 @@ def test(ctx, checks=False, doctest=False):
         ctx.run(' '.join(cmd))
 
 
+@task(help={
+      'size': 'Scale of the synthetic scenes: small, medium or large.',
+      'output': 'JSON file to write the results to.',
+      'compare': 'JSON file of previous results to compare the wall times against.'})
+def benchmark(ctx, size='small', output=None, compare=None):
+    """Run the conversion benchmarks."""
+    with chdir(BASE_FOLDER):
+        cmd = ['python scripts/benchmark.py', '--size {}'.format(size)]
+        if output:
+            cmd.append('--output {}'.format(output))
+        if compare:
+            cmd.append('--compare {}'.format(compare))
+
+        ctx.run(' '.join(cmd))
+
+
 @task
 def prepare_changelog(ctx):
     """Prepare changelog for next release."""
@@ -0,0 +1,44 @@
+import os
+
+import compas
+from compas.geometry import Box
+from compas.scene import Scene
+from pxr import Usd
+
+from compas_usd.batch import main
+
+
+def write_scenes(folder, n):
+    for i in range(n):
+        scene = Scene()
+        scene.add(Box(1.0 + i), name="Box")
+        compas.json_dump(scene, str(folder / "scene{}.json".format(i)))
+
+
+def test_main_converts_glob(tmp_path, capsys):
+    write_scenes(tmp_path, 3)
+    output = tmp_path / "usd"
+
+    assert main([str(tmp_path / "*.json"), "-o", str(output), "-f", "usda", "-p", "2"]) == 0
+    assert sorted(os.listdir(output)) == ["scene0.usda", "scene1.usda", "scene2.usda"]
+    assert Usd.Stage.Open(str(output / "scene2.usda")).GetPrimAtPath("/Scene/Box/Box")
+    assert "converted 3 scenes, skipped 0, failed 0" in capsys.readouterr().out
+
+
+def test_main_skips_up_to_date_outputs(tmp_path, capsys):
+    write_scenes(tmp_path, 2)
+    main([str(tmp_path / "scene0.json"), "-p", "1"])
+    capsys.readouterr()
+
+    assert main([str(tmp_path / "*.json"), "-p", "1"]) == 0
+    assert "converted 1 scenes, skipped 1, failed 0" in capsys.readouterr().out
+    assert os.path.exists(tmp_path / "scene1.usdc")
+
+
+def test_main_reports_failures(tmp_path, capsys):
+    (tmp_path / "broken.json").write_text("{")
+
+    assert main([str(tmp_path / "broken.json"), "-p", "1"]) == 1
+    captured = capsys.readouterr()
+    assert "failed: " in captured.err
+    assert "failed 1" in captured.out
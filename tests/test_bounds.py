@@ -0,0 +1,44 @@
+import math
+
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import allclose
+from pxr import Usd
+from pxr import UsdGeom
+
+from compas_usd.conversions import boxes_from_prims
+from compas_usd.conversions import prim_from_box
+from compas_usd.conversions import prim_from_mesh
+
+
+def test_prims_have_extents():
+    stage = Usd.Stage.CreateInMemory()
+    box = prim_from_box(stage, "/box", Box(1.0))
+    mesh = prim_from_mesh(stage, "/mesh", Mesh.from_meshgrid(dx=4, nx=2))
+
+    assert allclose([list(p) for p in box.GetExtentAttr().Get()], [(-0.5, -0.5, -0.5), (0.5, 0.5, 0.5)])
+    assert allclose([list(p) for p in mesh.GetExtentAttr().Get()], [(0, 0, 0), (4, 4, 0)])
+
+
+def test_boxes_from_prims_world_space():
+    stage = Usd.Stage.CreateInMemory()
+    frame = Frame([1, 2, 3], [math.cos(0.5), math.sin(0.5), 0], [-math.sin(0.5), math.cos(0.5), 0])
+    box = prim_from_box(stage, "/world/box", Box(2.0, 3.0, 4.0, frame=frame))
+    UsdGeom.Xform.Define(stage, "/world/empty")
+
+    bounds = boxes_from_prims([box, stage.GetPrimAtPath("/world/empty")])
+
+    assert allclose(bounds[0].frame.point, [1, 2, 3])
+    assert allclose(bounds[0].frame.xaxis, frame.xaxis)
+    assert allclose([bounds[0].xsize, bounds[0].ysize, bounds[0].zsize], [2, 3, 4])
+    assert bounds[1] is None
+
+
+def test_boxes_from_prims_purposes():
+    stage = Usd.Stage.CreateInMemory()
+    box = prim_from_box(stage, "/box", Box(1.0))
+    UsdGeom.Imageable(box).CreatePurposeAttr(UsdGeom.Tokens.proxy)
+
+    assert boxes_from_prims([box]) == [None]
+    assert boxes_from_prims([box], purposes=[UsdGeom.Tokens.proxy])[0].xsize == 1.0
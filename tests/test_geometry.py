@@ -0,0 +1,214 @@
+import numpy as np
+import pytest
+
+from compas.datastructures import Mesh
+from compas.geometry import NurbsSurface
+from compas.geometry import Point
+from compas.plugins import PluginNotInstalledError
+from compas.scene import Scene
+from pxr import Usd
+from pxr import UsdGeom
+
+from compas_usd.conversions import arrays_from_mesh
+from compas_usd.conversions import decimated_mesh_arrays
+from compas_usd.conversions import mesh_arrays_from_prim
+from compas_usd.conversions import mesh_from_prim
+from compas_usd.conversions import prim_from_mesh
+from compas_usd.conversions import prim_from_mesh_lods
+from compas_usd.conversions import prim_from_mesh_sequence
+from compas_usd.conversions import prim_from_surface
+from compas_usd.conversions import stage_from_scene
+from compas_usd.conversions import surface_from_prim
+from compas_usd.conversions import surface_parameters_from_prim
+
+
+def test_arrays_from_mesh_matches_vertices_and_faces():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices, faces = mesh.to_vertices_and_faces()
+    points, counts, indices = arrays_from_mesh(mesh)
+
+    assert np.allclose(points, vertices)
+    assert counts.tolist() == [len(face) for face in faces]
+    assert indices.tolist() == [index for face in faces for index in face]
+
+
+def test_arrays_from_mesh_remaps_vertex_keys():
+    mesh = Mesh.from_meshgrid(dx=10, nx=3)
+    mesh.delete_face(0)
+    mesh.remove_unused_vertices()
+    vertices, faces = mesh.to_vertices_and_faces()
+    points, counts, indices = arrays_from_mesh(mesh)
+
+    assert np.allclose(points, vertices)
+    assert indices.tolist() == [index for face in faces for index in face]
+
+
+def test_prim_from_mesh():
+    stage = Usd.Stage.CreateInMemory()
+    mesh = Mesh.from_meshgrid(dx=10, nx=4)
+    prim = prim_from_mesh(stage, "/mesh", mesh)
+    vertices, faces = mesh.to_vertices_and_faces()
+
+    assert np.allclose(np.array(prim.GetPointsAttr().Get()), vertices)
+    assert list(prim.GetFaceVertexCountsAttr().Get()) == [len(face) for face in faces]
+    assert list(prim.GetFaceVertexIndicesAttr().Get()) == [index for face in faces for index in face]
+
+
+def test_mesh_from_prim_roundtrip():
+    stage = Usd.Stage.CreateInMemory()
+    mesh = Mesh.from_meshgrid(dx=10, nx=4)
+    prim = prim_from_mesh(stage, "/mesh", mesh)
+    result = mesh_from_prim(prim.GetPrim())
+
+    vertices, faces = mesh.to_vertices_and_faces()
+    result_vertices, result_faces = result.to_vertices_and_faces()
+    assert np.allclose(result_vertices, vertices)
+    assert result_faces == faces
+
+
+def test_mesh_arrays_from_prim_are_views():
+    stage = Usd.Stage.CreateInMemory()
+    mesh = Mesh.from_meshgrid(dx=10, nx=4)
+    prim = prim_from_mesh(stage, "/mesh", mesh)
+    points, counts, indices = mesh_arrays_from_prim(prim)
+
+    assert points.shape == (mesh.number_of_vertices(), 3)
+    assert counts.shape == (mesh.number_of_faces(),)
+    assert indices.shape == (int(counts.sum()),)
+    assert not points.flags["OWNDATA"]
+    assert not points.flags["WRITEABLE"]
+
+
+def test_prim_from_mesh_sequence_varying_topology():
+    def meshes():
+        for i in range(6):
+            mesh = Mesh.from_meshgrid(dx=1.0 + i, nx=2)
+            if i >= 3:
+                mesh.delete_face(0)
+            yield mesh
+
+    stage = Usd.Stage.CreateInMemory()
+    prim = prim_from_mesh_sequence(stage, "/mesh", meshes(), start_time=1)
+
+    assert prim.GetPointsAttr().GetNumTimeSamples() == 6
+    assert prim.GetFaceVertexCountsAttr().GetTimeSamples() == [1, 4]
+    assert len(prim.GetFaceVertexCountsAttr().Get(3)) == 4
+    assert len(prim.GetFaceVertexCountsAttr().Get(6)) == 3
+    assert prim.GetPointsAttr().Get(6)[-1][0] == 6
+    assert prim.GetExtentAttr().Get(6)[1][0] == 6
+
+
+def test_prim_from_mesh_sequence_empty():
+    stage = Usd.Stage.CreateInMemory()
+
+    with pytest.raises(ValueError, match="at least one mesh"):
+        prim_from_mesh_sequence(stage, "/mesh", (mesh for mesh in []))
+
+
+class GridSurface(NurbsSurface):
+    # a clamped NURBS surface that does not need a geometry plugin
+    def __init__(self, points, weights, degree_u, degree_v):
+        super().__init__()
+        self._points = [[Point(*point) for point in row] for row in points]
+        self._weights = weights
+        self._degree_u = degree_u
+        self._degree_v = degree_v
+
+    points = property(lambda self: self._points)
+    weights = property(lambda self: self._weights)
+    degree_u = property(lambda self: self._degree_u)
+    degree_v = property(lambda self: self._degree_v)
+    knots_u = property(lambda self: [0.0, 1.0])
+    knots_v = property(lambda self: [0.0, 1.0])
+    mults_u = property(lambda self: [self._degree_u + 1] * 2)
+    mults_v = property(lambda self: [self._degree_v + 1] * 2)
+    knotvector_u = property(lambda self: [0.0] * (self._degree_u + 1) + [1.0] * (self._degree_u + 1))
+    knotvector_v = property(lambda self: [0.0] * (self._degree_v + 1) + [1.0] * (self._degree_v + 1))
+
+
+def make_surface():
+    points = [[[u, v, (u * v) % 3] for v in range(3)] for u in range(4)]
+    weights = [[1.0 + 0.1 * u + 0.01 * v for v in range(3)] for u in range(4)]
+    return GridSurface(points, weights, 3, 2)
+
+
+def test_prim_from_surface_point_order():
+    stage = Usd.Stage.CreateInMemory()
+    surface = make_surface()
+    prim = prim_from_surface(stage, "/surface", surface)
+
+    assert prim.GetUVertexCountAttr().Get() == 4
+    assert prim.GetVVertexCountAttr().Get() == 3
+    assert len(prim.GetUKnotsAttr().Get()) == 4 + prim.GetUOrderAttr().Get()
+    # the points of a patch vary fastest in u
+    assert list(prim.GetPointsAttr().Get()[1]) == list(surface.points[1][0])
+    assert prim.GetPointWeightsAttr().Get()[4] == surface.weights[0][1]
+
+
+def test_surface_parameters_from_prim_roundtrip():
+    stage = Usd.Stage.CreateInMemory()
+    surface = make_surface()
+    parameters = surface_parameters_from_prim(prim_from_surface(stage, "/surface", surface))
+
+    assert np.allclose(parameters["points"], surface.points)
+    assert np.allclose(parameters["weights"], surface.weights)
+    assert parameters["knots_u"] == surface.knots_u
+    assert parameters["mults_u"] == surface.mults_u
+    assert parameters["mults_v"] == surface.mults_v
+    assert (parameters["degree_u"], parameters["degree_v"]) == (3, 2)
+
+
+def test_surface_from_prim(monkeypatch):
+    stage = Usd.Stage.CreateInMemory()
+    prim = prim_from_surface(stage, "/surface", make_surface())
+    monkeypatch.setattr(NurbsSurface, "from_parameters", classmethod(lambda cls, **parameters: parameters))
+
+    assert surface_from_prim(prim) == surface_parameters_from_prim(prim)
+
+
+def test_surface_from_prim_without_plugin(monkeypatch):
+    stage = Usd.Stage.CreateInMemory()
+    prim = prim_from_surface(stage, "/surface", make_surface())
+
+    def from_parameters(cls, **parameters):
+        raise PluginNotInstalledError()
+
+    monkeypatch.setattr(NurbsSurface, "from_parameters", classmethod(from_parameters))
+
+    with pytest.raises(PluginNotInstalledError, match="surface_parameters_from_prim"):
+        surface_from_prim(prim)
+
+
+def test_stage_from_scene_surface(tmp_path):
+    scene = Scene()
+    scene.add(make_surface(), name="Panel")
+    expected = stage_from_scene(scene, str(tmp_path / "expected.usda"))
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), backend="sdf")
+
+    assert [prim.GetTypeName() for prim in stage.Traverse()][-1] == "NurbsPatch"
+    assert stage.GetRootLayer().ExportToString() == expected.GetRootLayer().ExportToString()
+
+
+def test_decimated_mesh_arrays_drops_collapsed_faces():
+    points, counts, indices = arrays_from_mesh(Mesh.from_meshgrid(dx=10, nx=40))
+    points, counts, indices = decimated_mesh_arrays(points, counts, indices, 4)
+
+    assert len(points) == 25
+    assert counts.tolist() == [4] * 16
+    assert indices.max() == len(points) - 1
+    assert points.min() >= 0 and points.max() <= 10
+
+
+def test_prim_from_mesh_lods():
+    stage = Usd.Stage.CreateInMemory()
+    mesh = Mesh.from_meshgrid(dx=10, nx=40)
+    prim = prim_from_mesh_lods(stage, "/mesh", mesh, lods={"high": None, "medium": 8, "proxy": 2})
+    variant_set = prim.GetPrim().GetVariantSet("lod")
+
+    assert variant_set.GetVariantSelection() == "high"
+    assert len(prim.GetFaceVertexCountsAttr().Get()) == mesh.number_of_faces()
+    assert prim.ComputePurpose() == UsdGeom.Tokens.default_
+
+    variant_set.SetVariantSelection("proxy")
+    assert len(prim.GetFaceVertexCountsAttr().Get()) == 4
+    assert prim.ComputePurpose() == UsdGeom.Tokens.proxy
@@ -1,10 +1,19 @@
+import gc
 import os
 import pytest
+import shutil
+import weakref
+from types import SimpleNamespace
 
+from compas.colors import Color
 from pxr import Usd
+from pxr import UsdGeom
+from pxr import UsdShade
 
 from compas_usd.material import USDMaterial
+from compas_usd.material import USDMaterialRegistry
 from compas_usd.material import USDPreviewSurface
+from compas_usd.material import USDTextureAssets
 
 BASE_FOLDER = os.path.dirname(__file__)
 
@@ -29,3 +38,100 @@ def test_grey_mdl(grey_mdl):
     stage = Usd.Stage.CreateInMemory()
     USDMaterial.from_mdl(stage, grey_mdl)
     print(stage.GetRootLayer().ExportToString())
+
+
+def make_material(name, color):
+    pbr = SimpleNamespace(base_color_texture=None, base_color_factor=color, metallic_roughness_texture=None, metallic_factor=0.0, roughness_factor=0.5)
+    return SimpleNamespace(
+        name=name,
+        normal_texture=None,
+        emissive_texture=None,
+        emissive_factor=None,
+        occlusion_texture=None,
+        pbr_specular_glossiness=None,
+        pbr_metallic_roughness=pbr,
+        alpha_mode=None,
+    )
+
+
+def test_from_material_deduplicates():
+    stage = Usd.Stage.CreateInMemory()
+    red = USDMaterial.from_material(stage, make_material("red", [1.0, 0.0, 0.0, 1.0]))
+    again = USDMaterial.from_material(stage, make_material("other", [1.0, 0.0, 0.0, 1.0]))
+    blue = USDMaterial.from_material(stage, make_material("red", [0.0, 0.0, 1.0, 1.0]))
+
+    assert again is red
+    assert str(red.GetPath()) == "/Looks/red"
+    assert str(blue.GetPath()) == "/Looks/red_1"
+    assert len(stage.GetPrimAtPath("/Looks").GetChildren()) == 2
+
+    # a new registry finds the materials already on the stage
+    registry = USDMaterialRegistry(stage)
+    assert USDMaterial.from_material(stage, make_material("red", [1.0, 0.0, 0.0, 1.0]), registry=registry).GetPath() == red.GetPath()
+
+
+def test_registry_does_not_keep_stage_alive():
+    stage = Usd.Stage.CreateInMemory()
+    registry = USDMaterialRegistry.from_stage(stage)
+    reference = weakref.ref(stage)
+    del stage
+    gc.collect()
+
+    assert reference() is None
+    assert registry.stage is None
+
+
+def test_material_shader_is_not_a_cycle():
+    stage = Usd.Stage.CreateInMemory()
+    material = USDMaterial.from_color(stage, Color.red())
+    assert isinstance(material.shader, USDPreviewSurface)
+    assert material.shader.material is material
+
+    # freed by reference counting alone, without a garbage collection
+    stage_ref = weakref.ref(stage)
+    del stage, material
+    assert stage_ref() is None
+
+
+def test_bind():
+    stage = Usd.Stage.CreateInMemory()
+    cube = UsdGeom.Cube.Define(stage, "/cube")
+    material = USDMaterial.from_material(stage, make_material("red", [1.0, 0.0, 0.0, 1.0])).bind(cube)
+
+    bound, _ = UsdShade.MaterialBindingAPI(cube.GetPrim()).ComputeBoundMaterial()
+    assert bound.GetPath() == material.GetPath()
+
+
+def test_texture_assets_copies_unique_images(tmp_path):
+    logo = os.path.join(BASE_FOLDER, "fixtures", "USDLogoLrg.png")
+    duplicate = str(tmp_path / "logo_copy.png")
+    shutil.copyfile(logo, duplicate)
+    stage = Usd.Stage.CreateNew(str(tmp_path / "scene.usda"))
+    assets = USDTextureAssets(stage)
+
+    path = assets.asset_path(logo)
+    assert path.startswith("./textures/")
+    assert assets.asset_path(duplicate) == path
+    assert os.listdir(tmp_path / "textures") == [path.split("/")[-1]]
+    assert USDTextureAssets(Usd.Stage.CreateInMemory()).asset_path(logo) == logo
+
+
+def test_texture_assets_do_not_keep_stage_alive():
+    stage = Usd.Stage.CreateInMemory()
+    USDMaterial.from_color(stage, Color.red())
+    reference = weakref.ref(stage)
+    del stage
+    gc.collect()
+
+    assert reference() is None
+
+
+def test_texture_assets_downscales(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    logo = os.path.join(BASE_FOLDER, "fixtures", "USDLogoLrg.png")
+    stage = Usd.Stage.CreateNew(str(tmp_path / "scene.usda"))
+
+    path = USDTextureAssets(stage, max_size=64, cache_dir=str(tmp_path / "cache")).asset_path(logo)
+    with Image.open(str(tmp_path / path)) as image:
+        assert max(image.size) == 64
+    assert os.listdir(tmp_path / "cache") == [path.split("/")[-1]]
@@ -0,0 +1,425 @@
+import multiprocessing
+import os
+import zipfile
+
+import pytest
+
+from compas.colors import Color
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Capsule
+from compas.geometry import Cone
+from compas.geometry import Cylinder
+from compas.geometry import Frame
+from compas.geometry import Polyhedron
+from compas.geometry import Sphere
+from compas.geometry import Torus
+from compas.geometry import allclose
+from compas.geometry import Translation
+from compas.scene import Scene
+from pxr import Usd
+from pxr import UsdShade
+
+from compas_usd.conversions import ExportProfile
+from compas_usd.conversions import USDSceneObject
+from compas_usd.conversions import prim_from_box
+from compas_usd.conversions import prim_from_mesh
+from compas_usd.conversions import register_converter
+from compas_usd.conversions import scene_from_stage
+from compas_usd.conversions import stage_from_scene
+from compas_usd.conversions import stage_from_scene_states
+from compas_usd.conversions import parallel
+from compas_usd.conversions import scene as scene_module
+from compas_usd.conversions.registry import ConverterRegistry
+
+
+@pytest.fixture
+def isolated_converters(monkeypatch):
+    # converters registered by a test do not leak into other tests
+    for name in ["PRIM_CONVERTERS", "SPEC_CONVERTERS"]:
+        registry = ConverterRegistry()
+        registry.converters.update(getattr(scene_module, name).converters)
+        monkeypatch.setattr(scene_module, name, registry)
+
+
+def make_scene():
+    scene = Scene()
+    boxes = scene.add_group(name="Boxes")
+    spheres = scene.add_group(name="Spheres", transformation=Translation.from_vector([0, 5, 0]))
+    scene.add(Mesh.from_meshgrid(dx=1, nx=2), name="MeshObj", transformation=Translation.from_vector([-5, 0, 0]))
+    for i in range(3):
+        boxes.add(Box(0.5), name=f"Box{i}", transformation=Translation.from_vector([i, 0, 0]))
+        spheres.add(Sphere(0.5), name=f"Sphere{i}", transformation=Translation.from_vector([i, 0, 0]))
+    return scene
+
+
+def prims(stage):
+    return {str(prim.GetPath()): prim.GetTypeName() for prim in stage.Traverse()}
+
+
+def test_stage_from_scene(tmp_path):
+    scene = make_scene()
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"))
+
+    assert stage.GetPrimAtPath(f"/{scene.name}/Boxes/Box0").GetTypeName() == "Xform"
+    assert stage.GetPrimAtPath(f"/{scene.name}/Spheres/Sphere2").IsValid()
+
+
+def test_stage_from_scene_streaming(tmp_path):
+    scene = make_scene()
+    expected = prims(stage_from_scene(scene, str(tmp_path / "expected.usda")))
+
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), streaming=True)
+    assert os.path.isfile(tmp_path / "scene" / "Boxes.usda")
+    assert os.path.isfile(tmp_path / "scene" / "Spheres.usda")
+    assert not stage.GetPrimAtPath(f"/{scene.name}/Boxes/Box0")
+
+    stage = Usd.Stage.Open(str(tmp_path / "scene.usda"))
+    assert prims(stage) == expected
+
+
+def test_stage_from_scene_instancing(tmp_path):
+    scene = make_scene()
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), instancing=True)
+
+    prototypes = stage.GetPrimAtPath("/Prototypes").GetAllChildren()
+    assert sorted(prim.GetName().split("_")[0] for prim in prototypes) == ["Box", "Mesh", "Sphere"]
+
+    instance = stage.GetPrimAtPath(f"/{scene.name}/Boxes/Box1/Box")
+    assert instance.IsInstance()
+    assert instance.GetChild("geometry").GetTypeName() == "Cube"
+
+
+def test_stage_from_scene_streaming_instancing(tmp_path):
+    scene = make_scene()
+    stage_from_scene(scene, str(tmp_path / "scene.usda"), streaming=True, instancing=True)
+
+    stage = Usd.Stage.Open(str(tmp_path / "scene.usda"))
+    instance = stage.GetPrimAtPath(f"/{scene.name}/Spheres/Sphere2/Sphere")
+    assert instance.IsInstance()
+    assert instance.GetChild("geometry").GetTypeName() == "Sphere"
+
+
+@pytest.mark.parametrize("instancing", [False, True])
+def test_stage_from_scene_sdf_backend(tmp_path, instancing):
+    scene = make_scene()
+    expected = stage_from_scene(scene, str(tmp_path / "expected.usda"), instancing=instancing)
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), instancing=instancing, backend="sdf")
+
+    assert stage.GetRootLayer().ExportToString() == expected.GetRootLayer().ExportToString()
+
+
+def test_stage_from_scene_streaming_sdf_backend(tmp_path):
+    scene = make_scene()
+    expected = prims(stage_from_scene(scene, str(tmp_path / "expected.usda")))
+    stage_from_scene(scene, str(tmp_path / "scene.usda"), streaming=True, backend="sdf")
+
+    assert prims(Usd.Stage.Open(str(tmp_path / "scene.usda"))) == expected
+
+
+def test_stage_from_scene_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        stage_from_scene(make_scene(), str(tmp_path / "scene.usda"), backend="gltf")
+
+
+@pytest.mark.parametrize("file_name, file_format, magic", [("scene.usdc", None, b"PXR-USDC"), ("scene.usd", "usdc", b"PXR-USDC"), ("scene.usd", "usda", b"#usda")])
+def test_stage_from_scene_file_format(tmp_path, file_name, file_format, magic):
+    stage_from_scene(make_scene(), str(tmp_path / file_name), file_format=file_format)
+
+    with open(tmp_path / file_name, "rb") as f:
+        assert f.read(len(magic)) == magic
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_stage_from_scene_usdz(tmp_path, streaming):
+    scene = make_scene()
+    expected = prims(stage_from_scene(scene, str(tmp_path / "expected.usda")))
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usdz"), streaming=streaming)
+    stage.Load()
+
+    assert zipfile.is_zipfile(tmp_path / "scene.usdz")
+    assert sorted(os.listdir(tmp_path)) == ["expected.usda", "scene.usdz"]
+    assert prims(stage) == expected
+
+
+def test_stage_from_scene_file_format_mismatch(tmp_path):
+    with pytest.raises(ValueError):
+        stage_from_scene(make_scene(), str(tmp_path / "scene.usda"), file_format="usdc")
+
+
+def test_stage_from_scene_twice_with_materials(tmp_path):
+    scene = make_scene()
+    scene.get_node_by_name("Box0").color = Color.red()
+    stage_from_scene(scene, str(tmp_path / "scene.usda"))
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"))
+
+    assert stage.GetPrimAtPath("/Looks")
+
+
+def test_scene_from_stage_roundtrip(tmp_path):
+    expected = stage_from_scene(make_scene(), str(tmp_path / "expected.usda"))
+    stage = stage_from_scene(scene_from_stage(expected), str(tmp_path / "scene.usda"))
+
+    assert stage.GetRootLayer().ExportToString() == expected.GetRootLayer().ExportToString()
+
+
+def test_scene_from_stage_skips_materials(tmp_path):
+    scene = make_scene()
+    for obj in scene.objects:
+        obj.color = Color.red()
+    stage = stage_from_scene(scene, str(tmp_path / "expected.usda"))
+    assert stage.GetPrimAtPath("/Looks")
+
+    result = scene_from_stage(stage)
+    assert result.name == "Scene"
+    assert sorted(obj.name for obj in result.root.children) == ["Boxes", "MeshObj", "Spheres"]
+    assert not any(obj.name == "Looks" or obj.name.startswith("color_") for obj in result.objects)
+
+
+def test_scene_from_stage_instancing(tmp_path):
+    expected = stage_from_scene(make_scene(), str(tmp_path / "expected.usda"))
+    instanced = stage_from_scene(make_scene(), str(tmp_path / "instanced.usda"), instancing=True)
+    stage = stage_from_scene(scene_from_stage(instanced), str(tmp_path / "scene.usda"))
+
+    assert prims(stage) == prims(expected)
+
+
+def test_scene_from_stage_is_lazy(tmp_path):
+    stage_from_scene(make_scene(), str(tmp_path / "scene.usdc"))
+    scene = scene_from_stage(str(tmp_path / "scene.usdc"))
+
+    sceneobject = scene.find_by_name("MeshObj")
+    assert isinstance(sceneobject, USDSceneObject)
+    assert not sceneobject.is_loaded
+    assert sceneobject.transformation == Translation.from_vector([-5, 0, 0])
+    assert sceneobject.item.number_of_faces() == 4
+    assert sceneobject.is_loaded
+    assert not scene.find_by_name("Box0").is_loaded
+
+
+def test_stage_from_scene_incremental(tmp_path, monkeypatch):
+    scene = make_scene()
+    path = str(tmp_path / "scene.usda")
+    stage_from_scene(scene, path, incremental=True)
+
+    boxes = scene.get_node_by_name("Boxes")
+    box = scene.get_node_by_name("Box1")
+    box.transformation = Translation.from_vector([1, 1, 0])
+    scene.remove(scene.get_node_by_name("Sphere2"))
+    boxes.add(Sphere(0.5), name="Box3")
+
+    authored = []
+    prim_from_item = scene_module.prim_from_item
+    monkeypatch.setattr(scene_module, "prim_from_item", lambda stage, item, **kwargs: authored.append(kwargs["parent_path"][-1]) or prim_from_item(stage, item, **kwargs))
+    stage = stage_from_scene(scene, path, incremental=True)
+
+    assert sorted(authored) == ["Box1", "Box3"]
+    assert not stage.GetPrimAtPath(f"/{scene.name}/Spheres/Sphere2")
+    assert prims(stage) == prims(stage_from_scene(scene, str(tmp_path / "expected.usda")))
+    assert stage.GetPrimAtPath(f"/{scene.name}/Boxes/Box1").GetAttribute("xformOp:transform").Get()[3][1] == 1
+
+
+def test_stage_from_scene_incremental_keeps_other_prims(tmp_path):
+    scene = make_scene()
+    path = str(tmp_path / "scene.usda")
+    stage = stage_from_scene(scene, path)
+    stage.DefinePrim("/Cameras/Main", "Camera")
+    stage.Save()
+    del stage
+
+    scene.remove(scene.get_node_by_name("Sphere2"))
+    stage = stage_from_scene(scene, path, incremental=True)
+
+    assert stage.GetPrimAtPath("/Cameras/Main")
+    assert not stage.GetPrimAtPath(f"/{scene.name}/Spheres/Sphere2")
+
+
+def test_stage_from_scene_incremental_materials(tmp_path, monkeypatch):
+    scene = make_scene()
+    for i in range(3):
+        scene.get_node_by_name(f"Box{i}").color = Color.red()
+    path = str(tmp_path / "scene.usda")
+    stage_from_scene(scene, path, incremental=True)
+
+    scene.get_node_by_name("Box1").color = Color.blue()
+    authored = []
+    prim_from_item = scene_module.prim_from_item
+    monkeypatch.setattr(scene_module, "prim_from_item", lambda stage, item, **kwargs: authored.append(kwargs["parent_path"][-1]) or prim_from_item(stage, item, **kwargs))
+    stage = stage_from_scene(scene, path, incremental=True)
+
+    def bound(path):
+        material, _ = UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(f"/{scene.name}/{path}")).ComputeBoundMaterial()
+        return material.GetPath().name
+
+    assert authored == ["Box1"]
+    assert stage.GetPrimAtPath("/Looks/color_ff0000")
+    assert [bound(f"Boxes/Box{i}/Box") for i in range(3)] == ["color_ff0000", "color_0000ff", "color_ff0000"]
+    assert not bound("MeshObj/Mesh")
+
+
+def test_stage_from_scene_states(tmp_path):
+    scene = make_scene()
+    box = scene.get_node_by_name("Box0")
+
+    def states():
+        for i in range(50):
+            box.transformation = Translation.from_vector([0, 0, i])
+            yield scene
+
+    stage = stage_from_scene_states(states(), str(tmp_path / "scene.usdc"))
+    attribute = stage.GetPrimAtPath(f"/{scene.name}/Boxes/Box0").GetAttribute("xformOp:transform")
+
+    assert (stage.GetStartTimeCode(), stage.GetEndTimeCode()) == (0, 49)
+    assert attribute.GetNumTimeSamples() == 50
+    assert attribute.Get(10)[3][2] == 10
+
+
+def test_stage_from_scene_states_materials(tmp_path):
+    scene = make_scene()
+    scene.get_node_by_name("Box0").color = Color.red()
+
+    stage = stage_from_scene_states([scene], str(tmp_path / "scene.usda"))
+    material, _ = UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(f"/{scene.name}/Boxes/Box0/Box")).ComputeBoundMaterial()
+
+    assert material.GetPath() == "/Looks/color_ff0000"
+
+
+def test_stage_from_scene_materials(tmp_path):
+    scene = make_scene()
+    for i in range(3):
+        scene.get_node_by_name(f"Box{i}").color = Color.red()
+    for i, color in enumerate([Color.blue(), Color.green(), Color.blue()]):
+        scene.get_node_by_name(f"Sphere{i}").color = color
+
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"))
+
+    def bound(path):
+        material, _ = UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(f"/{scene.name}/{path}")).ComputeBoundMaterial()
+        return material.GetPath().name
+
+    assert len(stage.GetPrimAtPath("/Looks").GetChildren()) == 3
+    assert UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(f"/{scene.name}/Boxes")).GetDirectBindingRel()
+    assert [bound(f"Boxes/Box{i}/Box") for i in range(3)] == ["color_ff0000"] * 3
+    assert [bound(f"Spheres/Sphere{i}/Sphere") for i in range(3)] == ["color_0000ff", "color_00ff00", "color_0000ff"]
+    assert not bound("MeshObj/Mesh")
+
+
+def make_shapes_scene():
+    scene = Scene()
+    frame = Frame([1, 2, 3], [0, 1, 0], [-1, 0, 0])
+    scene.add(Cylinder(1.0, 3.0, frame=frame), name="CylinderObj")
+    scene.add(Cone(1.0, 3.0, frame=frame), name="ConeObj")
+    scene.add(Capsule(0.5, 2.0, frame=frame), name="CapsuleObj")
+    scene.add(Torus(2.0, 0.5, frame=frame), name="TorusObj")
+    return scene
+
+
+@pytest.mark.parametrize("backend", ["usd", "sdf"])
+def test_stage_from_scene_shapes_roundtrip(tmp_path, backend):
+    scene = make_shapes_scene()
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), backend=backend)
+
+    assert [prims(stage)[f"/{scene.name}/{name}Obj/{name}"] for name in ["Cylinder", "Cone", "Capsule", "Torus"]] == ["Cylinder", "Cone", "Capsule", "Mesh"]
+    for original, sceneobject in zip(scene.root.children, scene_from_stage(stage).root.children):
+        item = sceneobject.item
+        assert type(item) is type(original.item)
+        assert allclose(item.frame.point, original.item.frame.point)
+        assert allclose(item.frame.xaxis, original.item.frame.xaxis)
+        assert allclose(item.frame.yaxis, original.item.frame.yaxis)
+
+
+def test_stage_from_scene_shapes_sdf_backend(tmp_path):
+    scene = make_shapes_scene()
+    expected = stage_from_scene(scene, str(tmp_path / "expected.usda"))
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), backend="sdf")
+
+    assert stage.GetRootLayer().ExportToString() == expected.GetRootLayer().ExportToString()
+
+
+def test_stage_from_scene_tessellates_other_shapes(tmp_path):
+    scene = Scene()
+    scene.add(Polyhedron.from_platonicsolid(6), name="Cube")
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"))
+
+    assert prims(stage)[f"/{scene.name}/Cube/Polyhedron"] == "Mesh"
+
+
+def test_register_converter(tmp_path, isolated_converters):
+    class Brick(Box):
+        pass
+
+    scene = Scene()
+    scene.add(Brick(1.0), name="BrickObj")
+    assert prims(stage_from_scene(scene, str(tmp_path / "box.usda")))[f"/{scene.name}/BrickObj/Brick"] == "Cube"
+
+    register_converter(Brick, lambda stage, path, item: prim_from_mesh(stage, path, Mesh.from_shape(item)))
+    assert prims(stage_from_scene(scene, str(tmp_path / "mesh.usda")))[f"/{scene.name}/BrickObj/Brick"] == "Mesh"
+
+
+def test_register_converter_lods(tmp_path, isolated_converters):
+    class Terrain(Mesh):
+        pass
+
+    scene = Scene()
+    scene.add(Terrain.from_meshgrid(dx=1, nx=2), name="TerrainObj")
+    register_converter(Terrain, lambda stage, path, item: prim_from_box(stage, path, Box(1.0)))
+    stage = stage_from_scene(scene, str(tmp_path / "scene.usda"), lods={"high": None, "proxy": 1})
+
+    assert prims(stage)[f"/{scene.name}/TerrainObj/Terrain"] == "Cube"
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs the fork start method")
+@pytest.mark.parametrize("backend, streaming", [("usd", False), ("sdf", False), ("usd", True)])
+def test_stage_from_scene_processes(tmp_path, monkeypatch, backend, streaming):
+    scene = make_scene()
+    scene.add(Mesh.from_meshgrid(dx=2, nx=3), name="OtherMeshObj")
+    stage_from_scene(scene, str(tmp_path / "expected.usda"), backend=backend, streaming=streaming)
+
+    prepared = []
+
+    def prepared_mesh_arrays(mesh):
+        arrays = parallel.prepared_mesh_arrays(mesh)
+        prepared.append(arrays is not None)
+        return arrays
+
+    monkeypatch.setattr(parallel, "MIN_POOL_FACES", 0)
+    monkeypatch.setattr(scene_module, "prepared_mesh_arrays", prepared_mesh_arrays)
+    stage_from_scene(scene, str(tmp_path / "scene.usda"), backend=backend, streaming=streaming, processes=2)
+
+    def layers(name):
+        # the payloads of a streaming export, or its only layer
+        paths = sorted((tmp_path / name).glob("*.usda")) if streaming else [tmp_path / f"{name}.usda"]
+        return [path.read_text() for path in paths]
+
+    assert prepared == [True, True]
+    assert layers("scene") == layers("expected")
+
+
+def test_stage_from_scene_processes_incremental(tmp_path):
+    with pytest.raises(ValueError):
+        stage_from_scene(make_scene(), str(tmp_path / "scene.usda"), incremental=True, processes=2)
+
+
+@pytest.mark.parametrize("backend", ["usd", "sdf"])
+def test_stage_from_scene_profiler(tmp_path, backend):
+    profiles = []
+    profile = ExportProfile(callback=profiles.append)
+    stage_from_scene(make_scene(), str(tmp_path / "scene.usdc"), backend=backend, profiler=profile)
+
+    assert profiles == [profile]
+    assert set(profile.phases) == {"author", "bind_materials", "save"}
+    assert profile.converters["Box"]["prims"] == 3
+    assert profile.converters["Mesh"]["elements"] == 9 + 4 + 16 + 2  # points, counts, indices, extent
+    assert profile.converters["Transformation"]["prims"] == 9
+    assert profile.bytes_saved == os.path.getsize(tmp_path / "scene.usdc")
+    assert "Transformation" in profile.report()
+
+
+def test_stage_from_scene_lods(tmp_path):
+    stage = stage_from_scene(make_scene(), str(tmp_path / "scene.usda"), lods={"high": None, "proxy": 1})
+    prim = stage.GetPrimAtPath("/Scene/MeshObj/Mesh")
+
+    assert prim.GetVariantSet("lod").GetVariantNames() == ["high", "proxy"]
+    assert stage.GetPrimAtPath("/Scene/Boxes/Box0/Box").GetTypeName() == "Cube"
+    with pytest.raises(ValueError):
+        stage_from_scene(make_scene(), str(tmp_path / "sdf.usda"), backend="sdf", lods={"proxy": 1})
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from compas.geometry import Frame
+from compas.geometry import Scale
+from compas.geometry import Transformation
+from compas.geometry import Box
+from pxr import Gf
+from pxr import Usd
+from pxr import UsdGeom
+
+from compas_usd.conversions import apply_transformations_on_prim
+from compas_usd.conversions import gfmatrix4d_from_transformation
+from compas_usd.conversions import gfvec3f_and_gfquatd_from_frame
+from compas_usd.conversions import gfvec3f_and_gfquatd_from_frames
+from compas_usd.conversions import matrices_from_vtmatrix4darray
+from compas_usd.conversions import prim_from_point_instances
+from compas_usd.conversions import transformations_from_prims
+from compas_usd.conversions import transformations_from_vtmatrix4darray
+from compas_usd.conversions import vtmatrix4darray_from_transformations
+
+
+def test_prim_from_point_instances_matches_transformations():
+    frames = [Frame.from_euler_angles([0.1 * i, 0.2 * i, 0.3 * i], point=[i, 2 * i, 0]) for i in range(20)]
+    transformations = [Transformation.from_frame(frame) * Scale.from_factors([1, 2, 3]) for frame in frames]
+
+    stage = Usd.Stage.CreateInMemory()
+    instancer = prim_from_point_instances(stage, "/instances", Box(1.0), transformations)
+    matrices = instancer.ComputeInstanceTransformsAtTime(Usd.TimeCode.Default(), Usd.TimeCode.Default())
+
+    assert len(matrices) == len(transformations)
+    for matrix, transformation in zip(matrices, transformations):
+        expected = Gf.Matrix4d(*np.array(transformation.matrix).T.flatten().tolist())
+        assert np.allclose(np.array(matrix), np.array(expected), atol=1e-2)
+
+
+def test_prim_from_point_instances_from_array():
+    stage = Usd.Stage.CreateInMemory()
+    matrices = np.tile(np.eye(4), (5, 1, 1))
+    matrices[:, 0, 3] = np.arange(5)
+    instancer = prim_from_point_instances(stage, "/instances", Box(1.0), matrices)
+
+    assert np.allclose(np.array(instancer.GetPositionsAttr().Get())[:, 0], np.arange(5))
+    assert not instancer.GetScalesAttr().HasAuthoredValue()
+    assert UsdGeom.Cube(stage.GetPrimAtPath("/instances/Prototypes/prototype"))
+    assert np.allclose(instancer.GetExtentAttr().Get(), [(-0.5, -0.5, -0.5), (4.5, 0.5, 0.5)])
+
+
+@pytest.mark.parametrize("factors", [[-1, 1, 1], [1, -2, 1], [-1, -1, -1]])
+def test_prim_from_point_instances_reflections(factors):
+    transformation = Transformation.from_frame(Frame.from_euler_angles([0.1, 0.2, 0.3], point=[1, 2, 3])) * Scale.from_factors(factors)
+
+    stage = Usd.Stage.CreateInMemory()
+    instancer = prim_from_point_instances(stage, "/instances", Box(1.0), [transformation])
+    matrix = instancer.ComputeInstanceTransformsAtTime(Usd.TimeCode.Default(), Usd.TimeCode.Default())[0]
+
+    assert np.allclose(np.array(matrix), np.array(transformation.matrix).T, atol=1e-2)
+
+
+def test_vtmatrix4darray_roundtrip():
+    frames = [Frame.from_euler_angles([0.1 * i, 0.2 * i, 0.3 * i], point=[i, 2 * i, 0]) for i in range(50)]
+    transformations = [Transformation.from_frame(frame) for frame in frames]
+
+    array = vtmatrix4darray_from_transformations(transformations)
+    assert len(array) == len(transformations)
+    for matrix, transformation in zip(array, transformations):
+        assert matrix == gfmatrix4d_from_transformation(transformation)
+
+    matrices = matrices_from_vtmatrix4darray(array)
+    assert np.allclose(matrices, [t.matrix for t in transformations])
+    assert transformations_from_vtmatrix4darray(array) == transformations
+
+
+def test_gfvec3f_and_gfquatd_from_frames():
+    frames = [Frame.from_euler_angles([0.1 * i, 0.2 * i, 0.3 * i], point=[i, 2 * i, 0]) for i in range(50)]
+    translations, orientations = gfvec3f_and_gfquatd_from_frames(frames)
+
+    for frame, translation, orientation in zip(frames, translations, orientations):
+        expected_translation, expected_orientation = gfvec3f_and_gfquatd_from_frame(frame)
+        assert Gf.IsClose(translation, expected_translation, 1e-6)
+        # q and -q describe the same rotation
+        assert abs(abs(Gf.Dot(orientation, expected_orientation)) - 1.0) < 1e-9
+
+
+def test_apply_transformations_on_prim():
+    stage = Usd.Stage.CreateInMemory()
+    xform = UsdGeom.Xform.Define(stage, "/xform")
+    frames = (Frame.from_euler_angles([0.01 * i, 0, 0], point=[i, 0, 0]) for i in range(2500))
+
+    end = apply_transformations_on_prim(xform, (Transformation.from_frame(frame) for frame in frames), start_time=1, chunk_size=1000)
+
+    assert end == 2500
+    assert xform.GetXformOpOrderAttr().Get() == ["xformOp:transform"]
+    assert xform.GetPrim().GetAttribute("xformOp:transform").GetNumTimeSamples() == 2500
+    assert xform.GetLocalTransformation(1000)[3][0] == 999
+
+
+def test_transformations_from_prims_world_space():
+    stage = Usd.Stage.CreateInMemory()
+    root = UsdGeom.Xform.Define(stage, "/root")
+    apply_transformations_on_prim(root, [Transformation.from_frame(Frame.from_euler_angles([0, 0, 0.1 * i], point=[i, 0, 0])) for i in range(3)])
+    paths = []
+    for i in range(5):
+        child = UsdGeom.Xform.Define(stage, "/root/child{}".format(i))
+        child.AddTransformOp().Set(gfmatrix4d_from_transformation(Transformation.from_frame(Frame([0, i, 0], [1, 0, 0], [0, 0, 1]))))
+        paths.append(str(child.GetPath()))
+
+    matrices = transformations_from_prims(stage, paths, time=2, as_array=True)
+    transformations = transformations_from_prims(stage, paths, time=2)
+
+    assert matrices.shape == (5, 4, 4)
+    for path, matrix, transformation in zip(paths, matrices, transformations):
+        expected = UsdGeom.Xformable(stage.GetPrimAtPath(path)).ComputeLocalToWorldTransform(2)
+        assert np.allclose(matrix, np.array(expected).T)
+        assert np.allclose(transformation.matrix, matrix)
+
+
+def test_transformations_from_prims_missing_prim():
+    stage = Usd.Stage.CreateInMemory()
+    with pytest.raises(ValueError):
+        transformations_from_prims(stage, ["/missing"])